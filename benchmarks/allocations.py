@@ -0,0 +1,96 @@
+"""
+Uses tracemalloc to check that the steady-state frame loop allocates no new
+Geometry or Vector2 objects per entity. Exits with 1 when it does. Rotated
+sprites are cached once per rotation step, so the cache is filled for every
+step before measuring.
+
+    $ python -m benchmarks.allocations
+"""
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame.math import Vector2
+
+from space_rocks import constants
+
+# room for every rotation step of every sprite, an LRU that evicts refills forever
+constants.ROTATION_CACHE_MB = 1024
+
+import space_rocks.audio as sounds
+import space_rocks.graphics as gfx
+from space_rocks.levels import World
+from space_rocks.utils import bounce_other, get_blit_position, seed_random
+
+WARMUP_FRAMES = 10
+FRAMES = 500
+
+
+def _state(level) -> list:
+    return [
+        (id(g), id(g.position), id(g.velocity))
+        for g in (o.geometry for o in level.game_objects)
+    ]
+
+
+def main():
+    seed_random(1)
+    pygame.init()
+    screen = pygame.display.set_mode((constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT))
+    world = World(screen)
+    _, level_name = world.get_current_level()
+    sounds.init(level_name)
+    gfx.init(level_name)
+    level = world.start_level(0)
+    level.player.shoot()
+    game_objects = list(level.game_objects)
+    player = level.player
+
+    def frame():
+        player.rotate()
+        player.accelerate()
+        for o in game_objects:
+            o.move(screen)
+            bounce_other(o.geometry, player.geometry)
+            get_blit_position(o.image, o.geometry.position)
+
+    for o in game_objects:
+        o.warm_rotations()
+
+    tracemalloc.start()
+    for _ in range(WARMUP_FRAMES):
+        frame()
+    before_state = _state(level)
+    before = tracemalloc.take_snapshot()
+    for _ in range(FRAMES):
+        frame()
+    after = tracemalloc.take_snapshot()
+    after_state = _state(level)
+    tracemalloc.stop()
+
+    # anything smaller than a Vector2 (floats, small ints) can not be one
+    min_size = sys.getsizeof(Vector2())
+    own_files = [tracemalloc.Filter(True, "*space_rocks*")]
+    growth = [
+        s
+        for s in after.filter_traces(own_files).compare_to(
+            before.filter_traces(own_files), "lineno"
+        )
+        if s.count_diff > 0 and s.size_diff / s.count_diff >= min_size
+    ]
+    replaced = sum(1 for a, b in zip(before_state, after_state) if a != b)
+
+    print(f"{len(game_objects)} entities, {FRAMES} frames")
+    print(f"entities with replaced Geometry/Vector2: {replaced}")
+    print(f"allocation sites that grew: {len(growth)}")
+    for s in growth[:10]:
+        print(f"  {s}")
+    sys.exit(1 if replaced or growth else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares the brute force bullet x enemy loop against the uniform grid broad-phase.
+
+    $ python -m benchmarks.collisions
+"""
+import random
+import time
+from typing import Callable, List
+
+from pygame.math import Vector2
+from pygame.surface import Surface
+
+from space_rocks import constants
+from space_rocks.models import GameObject
+from space_rocks.spatial import SpatialGrid
+from space_rocks.utils import collides_with
+
+ENEMY_COUNTS = (10, 100, 1000)
+BULLET_COUNT = 100
+FRAMES = 100
+
+
+def _create_objects(count: int, size: int) -> List[GameObject]:
+    image = Surface((size, size))
+    return [
+        GameObject(
+            Vector2(
+                random.uniform(0, constants.SCREEN_WIDTH),
+                random.uniform(0, constants.SCREEN_HEIGHT),
+            ),
+            image,
+            Vector2(random.uniform(-5, 5), random.uniform(-5, 5)),
+        )
+        for _ in range(count)
+    ]
+
+
+def _move(objects: List[GameObject]):
+    for o in objects:
+        g = o.geometry
+        o.geometry = g.update_pos(g.position + g.velocity)
+
+
+def _brute_force(enemies: List[GameObject], bullets: List[GameObject]) -> int:
+    hits = 0
+    for b in bullets:
+        for a in enemies:
+            if collides_with(a.geometry, b.geometry):
+                hits += 1
+                break
+    return hits
+
+
+def _with_grid(enemies: List[GameObject]) -> Callable[..., int]:
+    grid: SpatialGrid[GameObject] = SpatialGrid()
+    for e in enemies:
+        grid.insert(e)
+
+    def run(enemies: List[GameObject], bullets: List[GameObject]) -> int:
+        grid.update_all(enemies)
+        hits = 0
+        for b in bullets:
+            for a in grid.query(b.geometry):
+                if collides_with(a.geometry, b.geometry):
+                    hits += 1
+                    break
+        return hits
+
+    return run
+
+
+def _measure(enemy_count: int, use_grid: bool) -> float:
+    random.seed(enemy_count)
+    enemies = _create_objects(enemy_count, 60)
+    bullets = _create_objects(BULLET_COUNT, 8)
+    run = _with_grid(enemies) if use_grid else _brute_force
+
+    elapsed = 0.0
+    for _ in range(FRAMES):
+        _move(enemies)
+        _move(bullets)
+        start = time.perf_counter()
+        run(enemies, bullets)
+        elapsed += time.perf_counter() - start
+    return elapsed / FRAMES * 1000
+
+
+def main():
+    print(f"{BULLET_COUNT} bullets, {FRAMES} frames, ms per frame")
+    print(f"{'enemies':>8} {'brute':>10} {'grid':>10}")
+    for n in ENEMY_COUNTS:
+        brute = _measure(n, use_grid=False)
+        grid = _measure(n, use_grid=True)
+        print(f"{n:>8} {brute:>10.3f} {grid:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures Game._draw during a firefight with hundreds of bullets, drawing every
+object with its own blit and in batches from the texture atlas.
+
+    $ python -m benchmarks.draw
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from pygame.math import Vector2
+
+from space_rocks import constants
+from space_rocks.game import Game
+from space_rocks.utils import seed_random
+
+BULLETS = 500
+FRAMES = 300
+
+
+def _ms_per_frame(game: Game, batched: bool) -> float:
+    constants.BATCHED_DRAW = batched
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        game._draw()
+    return (time.perf_counter() - start) * 1000 / FRAMES
+
+
+def main():
+    seed_random(1)
+    game = Game(headless=True)
+    game.start_the_game()
+    game.wait_for_level()
+
+    level = game.level
+    weapon = level.player.properties.primary_weapon
+    w, h = game._screen.get_size()
+    for i in range(BULLETS):
+        position = Vector2((i * 37) % w, (i * 91) % h)
+        level._add_bullet(weapon, position, Vector2(0))
+
+    per_object = _ms_per_frame(game, batched=False)
+    batched = _ms_per_frame(game, batched=True)
+    print(f"{len(level.game_objects)} objects, {FRAMES} frames")
+    print(f"per object: {per_object:>8.2f} ms/frame")
+    print(f"batched:    {batched:>8.2f} ms/frame")
+    print(f"atlas: {game._atlas.sprites} sprites on {game._atlas.pages} pages")
+
+
+if __name__ == "__main__":
+    main()
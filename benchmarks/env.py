@@ -0,0 +1,52 @@
+"""
+Measures environment steps per second with random actions, for one Env in this
+process and for a VectorEnv with a worker per core, without and with frames.
+
+    $ python -m benchmarks.env
+"""
+import os
+import time
+
+import numpy as np
+
+from space_rocks.env import ACTIONS, Env, VectorEnv
+
+STEPS = 600
+FRAME_SIZE = (84, 84)
+
+
+def _single(frame: bool) -> float:
+    env = Env(frame_size=FRAME_SIZE if frame else None)
+    env.reset(seed=1)
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        _, _, terminated, truncated, _ = env.step(int(rng.integers(ACTIONS)))
+        if terminated or truncated:
+            env.reset()
+    return STEPS / (time.perf_counter() - start)
+
+
+def _vector(n: int, frame: bool) -> float:
+    env = VectorEnv(n, seed=1, frame_size=FRAME_SIZE if frame else None)
+    env.reset()
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        env.step(rng.integers(ACTIONS, size=n))
+    elapsed = time.perf_counter() - start
+    env.close()
+    return STEPS * n / elapsed
+
+
+def main():
+    n = os.cpu_count() or 1
+    for frame in (False, True):
+        label = f"frame {FRAME_SIZE}" if frame else "no frame"
+        print(f"{label}:")
+        print(f"  Env:          {_single(frame):>8.0f} steps/s")
+        print(f"  VectorEnv x{n}: {_vector(n, frame):>8.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares level asset load times from a pack and from the level directory.
+Every mode runs in a fresh process: the first load there is the cold one,
+the following ones are warm. Build the packs first with space_rocks.packer.
+
+    $ python -m benchmarks.level_load [level_dir]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import space_rocks.audio as sounds
+from space_rocks import constants, packs
+from space_rocks.levels import load_assets
+
+WARM_LOADS = 5
+
+
+def _measure(level_name: str, use_pack: bool):
+    sounds.init_audio()
+    pygame.display.set_mode((1, 1))
+    constants.USE_PACKS = use_pack
+    timings = []
+    for _ in range(WARM_LOADS + 1):
+        start = time.perf_counter()
+        load_assets(level_name)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(json.dumps({"cold": timings[0], "warm": sum(timings[1:]) / WARM_LOADS}))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        _measure(sys.argv[2], sys.argv[3] == "pack")
+        return
+
+    level_name = sys.argv[1] if len(sys.argv) > 1 else "0_level1"
+    if not os.path.isfile(packs.pack_path(level_name)):
+        sys.exit(f"no pack for {level_name}, run python -m space_rocks.packer first")
+
+    print(f"{level_name}, ms per load, warm is the mean of {WARM_LOADS}")
+    print(f"{'source':>10} {'cold':>10} {'warm':>10}")
+    for mode in ("directory", "pack"):
+        command = ["-m", "benchmarks.level_load", "--measure", level_name, mode]
+        out = subprocess.run(
+            [sys.executable, *command],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:>10} {result['cold']:>10.1f} {result['warm']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
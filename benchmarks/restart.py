@@ -0,0 +1,70 @@
+"""
+Measures restart latency, what pressing 8 costs: reading the level json,
+starting the current level again once its assets are installed, and the whole
+restart through the game's loader. Runs with the compiled level cache dropped
+before every restart (the old behaviour of parsing and validating the json each
+time) and kept warm.
+
+    $ python -m benchmarks.restart [level_id]
+"""
+import os
+import sys
+import time
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from space_rocks.game import Game
+from space_rocks import constants
+from space_rocks.levels import clear_compiled_levels, compiled_level
+
+RESTARTS = 20
+
+
+def _ms_per_restart(restart: Callable[[], None], cached: bool) -> float:
+    total = 0.0
+    for _ in range(RESTARTS):
+        if not cached:
+            clear_compiled_levels()
+        start = time.perf_counter()
+        restart()
+        total += time.perf_counter() - start
+    return total * 1000 / RESTARTS
+
+
+def main():
+    level_id = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    game = Game(headless=True)
+    game.set_level(level_id)
+    game.start_the_game()
+    game.wait_for_level()
+    world = game._world
+    _, level_name = world.get_current_level()
+    json_path = os.path.join(constants.LEVELS_ROOT, level_name, ".json")
+
+    def compile_level():
+        compiled_level(json_path)
+
+    def start_level():
+        world.start_level(level_id)
+
+    def restart():
+        game._initialize_level()
+        game.wait_for_level()
+
+    print(f"level {level_id}, ms per restart, mean of {RESTARTS}")
+    print(f"{'':>12} {'uncached':>10} {'cached':>10}")
+    for name, phase in (
+        ("compile", compile_level),
+        ("start_level", start_level),
+        ("restart", restart),
+    ):
+        uncached = _ms_per_restart(phase, cached=False)
+        cached = _ms_per_restart(phase, cached=True)
+        print(f"{name:>12} {uncached:>10.2f} {cached:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures how many bullets per second Bullet construction allows, with the
+derived sprite cache warm and with it dropped before every shot (the old
+behaviour of graphics.get), and how many the level's bullet pool allows.
+
+    $ python -m benchmarks.shots
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame.math import Vector2
+
+import space_rocks.audio as sounds
+import space_rocks.graphics as gfx
+from space_rocks import constants
+from space_rocks.levels import World
+from space_rocks.models import Bullet
+
+SHOTS = 5000
+
+
+def _shots_per_second(level, cached: bool) -> float:
+    weapon = level.player.properties.primary_weapon
+    position = Vector2(level.player.geometry.position)
+    velocity = Vector2(0, -weapon.speed)
+    start = time.perf_counter()
+    for _ in range(SHOTS):
+        if not cached:
+            gfx.invalidate()
+        Bullet(weapon, position, velocity)
+    return SHOTS / (time.perf_counter() - start)
+
+
+def _pooled_shots_per_second(level) -> float:
+    weapon = level.player.properties.primary_weapon
+    position = Vector2(level.player.geometry.position)
+    velocity = Vector2(0, -weapon.speed)
+    pool = level.bullet_pool
+    start = time.perf_counter()
+    for _ in range(SHOTS):
+        bullet = pool.acquire()
+        bullet.reset(weapon, position, velocity)
+        pool.release(bullet)
+    return SHOTS / (time.perf_counter() - start)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT))
+    world = World(screen)
+    _, level_name = world.get_current_level()
+    sounds.init(level_name)
+    gfx.init(level_name)
+    level = world.start_level(0)
+
+    before = _shots_per_second(level, cached=False)
+    after = _shots_per_second(level, cached=True)
+    pooled = _pooled_shots_per_second(level)
+    print(f"{SHOTS} shots")
+    print(f"uncached: {before:>10.0f} shots/s")
+    print(f"cached:   {after:>10.0f} shots/s")
+    print(f"pooled:   {pooled:>10.0f} shots/s")
+    print(gfx.cache_stats())
+    print(level.bullet_pool.stats)
+
+
+if __name__ == "__main__":
+    main()
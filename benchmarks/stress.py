@@ -0,0 +1,77 @@
+"""
+Runs the generated stress levels of space_rocks.levelgen.SCENARIOS headless,
+with the autopilot shooting, and prints ms per tick for each phase, ticks per
+second and the most entities alive at once.
+
+    $ python -m benchmarks.stress
+    $ python -m benchmarks.stress --scenario 10k --ticks 60 --no-draw
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Dict
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from space_rocks import constants
+from space_rocks.batch import Autopilot
+from space_rocks.game import Game
+from space_rocks.levelgen import SCENARIOS, TEMPLATE, generate, max_enemies
+from space_rocks.levels import read_level_json
+from space_rocks.models import GameState
+from space_rocks.utils import seed_random, use_simulated_ticks
+
+LEVEL_ID = 0  # whose assets the generated levels use, as in TEMPLATE
+
+
+def _run(game: Game, scenario: str, ticks: int, draw: bool):
+    params = SCENARIOS[scenario]
+    game.replace_level(LEVEL_ID, generate(params, read_level_json(TEMPLATE)))
+    seed_random(1)
+    use_simulated_ticks(0)
+    start = time.perf_counter()
+    game.set_level(LEVEL_ID)
+    game.start_the_game()
+    game.wait_for_level()
+    load_s = time.perf_counter() - start
+
+    step_ms = 1000 / constants.SIMULATION_RATE
+    timings: Dict[str, float] = {}
+    peak = 0
+    steps = 0
+    start = time.perf_counter()
+    while steps < ticks and game.state is GameState.RUNNING:
+        steps += 1
+        use_simulated_ticks(int(steps * step_ms))
+        game.tick(draw, timings)
+        peak = max(peak, len(game.level.game_objects))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{scenario}: {params.enemies} enemies, up to {max_enemies(params)}, "
+        f"loaded in {load_s:.2f} s"
+    )
+    print(f"  {steps / elapsed:>9.1f} ticks/s, peak {peak} entities")
+    for name, total in timings.items():
+        print(f"  {name:<20} {total / steps:>9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append")
+    parser.add_argument("--ticks", type=int, default=120, help="per scenario")
+    parser.add_argument("--no-draw", dest="draw", action="store_false")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    game: Game = Game(headless=True, inputs=Autopilot(lambda: game.level))
+    for scenario in args.scenario or SCENARIOS:
+        _run(game, scenario, args.ticks, args.draw)
+    game.replace_level(LEVEL_ID, None)
+
+
+if __name__ == "__main__":
+    main()
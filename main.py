@@ -1,5 +1,40 @@
+import argparse
+import random
+
+from space_rocks import constants, profiler
 from space_rocks.game import Game
+from space_rocks.inputs import RecordingInputs
+from space_rocks.utils import seed_random, use_simulated_ticks
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"profiles until exit into {constants.PROFILE_PATH}.trace.json/.folded",
+    )
+    parser.add_argument(
+        "--profile-sample",
+        type=float,
+        default=constants.PROFILE_SAMPLE_MS,
+        metavar="MS",
+        help="also samples the call stack every MS while profiling",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="records the session for python -m space_rocks.replay PATH",
+    )
+    args = parser.parse_args()
+    if args.profile:
+        profiler.start(args.profile_sample)
+    inputs = None
+    if args.record:
+        # levels are built from the seed and simulated ticks, as in the replay
+        seed = random.randrange(2 ** 31)
+        seed_random(seed)
+        use_simulated_ticks(0)
+        inputs = RecordingInputs(args.record, seed)
+
+    game = Game(inputs=inputs)
     game.main_loop()
@@ -8,6 +8,7 @@ from pygame.rect import Rect
 from pygame.surface import Surface
 
 from space_rocks import constants
+from space_rocks.pool import Pool, PoolStats
 from space_rocks.utils import (
     get_random_choice,
     scale_surface,
@@ -25,12 +26,22 @@ class Animation:
         position: Vector2,
         speed: float,
         repeat: bool = False,
+    ):
+        self._position = Vector2(position)
+        self.reset(frames, position, speed, repeat)
+
+    def reset(
+        self,
+        frames: list[Surface],
+        position: Vector2,
+        speed: float,
+        repeat: bool = False,
     ):
         self._frames = frames
         self._time = 0.0
         self._frame_index = 0
-        self._position = position
-        self._speed = speed
+        self._position.update(position)
+        self._speed = speed * constants.JSON_SPEED_RATE  # frames per second
         self._repeat = repeat
 
     @property
@@ -40,18 +51,26 @@ class Animation:
         return self._frame_index >= len(self._frames) - 1
 
     def move(self):
-        self._time += self._speed
+        self._time += self._speed / constants.SIMULATION_RATE
         if self._time > 1:
             self._frame_index += 1
-            self._time = 0
+            self._time -= 1
 
-    def draw(self, surface: Surface):
+    @property
+    def position(self) -> Vector2:
+        return self._position
+
+    def frame_image(self) -> Optional[Surface]:
         if self.complete:
-            return
+            return None
         if self._frame_index >= len(self._frames) - 1:
             self._frame_index = 0
+        return self._frames[self._frame_index]
 
-        img = self._frames[self._frame_index]
+    def draw(self, surface: Surface):
+        img = self.frame_image()
+        if img is None:
+            return
         blit_position = get_blit_position(img, self._position)
         surface.blit(img, blit_position)
 
@@ -61,59 +80,118 @@ class AnimationData(NamedTuple):
     speed: float
 
 
+_ResizedKey = Tuple[str, Tuple[int, int]]
+
+
+class AnimationBank(NamedTuple):
+    animations: Dict[str, AnimationData]
+    resized: Dict[_ResizedKey, AnimationData]
+
+
 _bank: Dict[str, AnimationData] = {}
+_resized: Dict[_ResizedKey, AnimationData] = {}
+_pool: Pool[Animation] = Pool(lambda: Animation([], Vector2(), 1))
+
+
+def _scale(anim_data: AnimationData, size: Tuple[int, int]) -> AnimationData:
+    return AnimationData(
+        [scale_surface(img, size) for img in anim_data.frames],
+        anim_data.speed,
+    )
+
 
+def _resize(name: str, size: Tuple[int, int]) -> AnimationData:
+    key = (name, size)
+    if key not in _resized:
+        _resized[key] = _scale(_bank[name], size)
+    return _resized[key]
 
-def _init(level_name: str) -> None:
-    def create_frames(img: Surface, rows: int, columns: int) -> list[Surface]:
-        h = int(img.get_height() / rows)
-        w = int(img.get_width() / columns)
-        size = w, h
-        images: List[Surface] = []
-        orig_alpha = img.get_alpha()
-        orig_ckey = img.get_colorkey()
-        img.set_colorkey(None)
-        img.set_alpha(None)
 
-        for y in range(0, img.get_height(), h):
-            for x in range(0, img.get_width(), w):
-                i = Surface(size)
-                i.blit(img, (0, 0), Rect(x, y, w, h))
-                if orig_alpha:
-                    i.set_colorkey((0, 0, 0))
-                elif orig_ckey:
-                    i.set_colorkey(orig_ckey)
+def _create_frames(img: Surface, rows: int, columns: int) -> list[Surface]:
+    h = int(img.get_height() / rows)
+    w = int(img.get_width() / columns)
+    size = w, h
+    images: List[Surface] = []
+    orig_alpha = img.get_alpha()
+    orig_ckey = img.get_colorkey()
+    img.set_colorkey(None)
+    img.set_alpha(None)
 
-                images.append(i.convert_alpha())
+    for y in range(0, img.get_height(), h):
+        for x in range(0, img.get_width(), w):
+            i = Surface(size)
+            i.blit(img, (0, 0), Rect(x, y, w, h))
+            if orig_alpha:
+                i.set_colorkey((0, 0, 0))
+            elif orig_ckey:
+                i.set_colorkey(orig_ckey)
 
-        img.set_alpha(orig_alpha)
-        img.set_colorkey(orig_ckey)
-        return images
+            images.append(i.convert_alpha())
 
-    def _load_from(path: str):
+    img.set_alpha(orig_alpha)
+    img.set_colorkey(orig_ckey)
+    return images
 
-        if not os.path.isfile(os.path.join(path, ".json")):
+
+def _load_from(path: str, bank: AnimationBank, only: Optional[str] = None):
+    """ slices the sheets listed in the .json of path, or just the one named only """
+    if not os.path.isfile(os.path.join(path, ".json")):
+        return
+
+    with open(os.path.join(path, ".json")) as json_file:
+        if not json_file:
             return
+        data = json.load(json_file)
 
-        with open(os.path.join(path, ".json")) as json_file:
-            if not json_file:
-                return
-            data = json.load(json_file)
+    for d in data["animations"]:
+        img_name = d["image"].lower()
+        if only is not None and img_name != only:
+            continue
+        img_path = f"{os.path.join(path, img_name + '.png')}"
 
-        for d in data["animations"]:
-            img_name = d["image"].lower()
-            img_path = f"{os.path.join(path, img_name + '.png')}"
+        img = create_surface_from_image(img_path)
+        frames = _create_frames(img, d["rows"], d["columns"])
 
-            img = create_surface_from_image(img_path)
-            frames = create_frames(img, d["rows"], d["columns"])
+        anim_data = AnimationData(frames, d["speed"])
+        bank.animations[img_name] = anim_data
+        for w, h in d.get("sizes", []):
+            bank.resized[(img_name, (w, h))] = _scale(anim_data, (w, h))
 
-            _bank[img_name] = AnimationData(frames, d["speed"])
 
-    # load default assets
-    _load_from(f"{constants.LEVELS_ROOT}{level_name.lower()}/anim/")
+def load(level_name: str) -> AnimationBank:
+    """ slices the sprite sheets of a level without touching the active ones """
+    bank = AnimationBank({}, {})
+
+    # load level assets
+    _load_from(f"{constants.LEVELS_ROOT}{level_name.lower()}/anim/", bank)
 
     # load default assets
-    _load_from(constants.ANIM_ASSETS_ROOT)
+    _load_from(constants.ANIM_ASSETS_ROOT, bank)
+    return bank
+
+
+def reload(path: str):
+    """
+    Slices a changed sheet again, or every sheet of its folder when its .json
+    changed, into the active animations. Playing animations keep their frames.
+    """
+    directory, file_name = os.path.split(path)
+    only = None if file_name == ".json" else file_name.lower().split(".")[0]
+    bank = AnimationBank({}, {})
+    _load_from(directory, bank, only)
+    for name in bank.animations:
+        for key in [k for k in _resized if k[0] == name]:
+            del _resized[key]
+    _bank.update(bank.animations)
+    _resized.update(bank.resized)
+    logger.info(f"{len(bank.animations)} animations reloaded from {path}")
+
+
+def install(bank: AnimationBank):
+    global _resized
+    _bank.update(bank.animations)
+    _resized = dict(bank.resized)
+    _log_state()
 
 
 def get(
@@ -124,14 +202,24 @@ def get(
     if name not in _bank:
         anim_data = AnimationData([], 1)
     else:
-        anim_data = _bank[name]
-        if resize:
-            anim_data = AnimationData(
-                [scale_surface(img, resize) for img in anim_data.frames],
-                anim_data.speed,
-            )
+        anim_data = _resize(name, resize) if resize else _bank[name]
+
+    animation = _pool.acquire()
+    animation.reset(anim_data.frames, position, anim_data.speed)
+    return animation
+
+
+def release(animation: Animation):
+    """ hands an animation from get back for reuse """
+    _pool.release(animation)
 
-    return Animation(anim_data.frames, position, anim_data.speed)
+
+def reserve(count: int):
+    _pool.reserve(count)
+
+
+def pool_stats() -> PoolStats:
+    return _pool.stats
 
 
 def _log_state():
@@ -144,5 +232,4 @@ def count():
 
 
 def init(level_name: str):
-    _init(level_name)
-    _log_state()
+    install(load(level_name))
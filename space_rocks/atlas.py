@@ -0,0 +1,135 @@
+import weakref
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pygame
+from pygame.rect import Rect
+from pygame.surface import Surface
+
+import space_rocks.graphics as gfx
+from space_rocks import constants
+from space_rocks.utils import create_surface_alpha
+
+
+class _Page:
+    """ shelf packer, sprites go left to right on rows as high as their tallest """
+
+    def __init__(self, size: int):
+        self.surface = create_surface_alpha((size, size)).convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+        self._size = size
+        self._x = 0
+        self._y = 0
+        self._shelf_height = 0
+
+    def place(self, w: int, h: int) -> Tuple[int, int]:
+        """ top left corner for a w x h sprite, (-1, -1) when it does not fit """
+        x, y, shelf_height = self._x, self._y, self._shelf_height
+        if x + w > self._size:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + h > self._size:
+            return -1, -1
+        self._x = x + w
+        self._y = y
+        self._shelf_height = max(shelf_height, h)
+        return x, y
+
+
+_Region = Tuple[Surface, Optional[Rect]]
+
+
+class TextureAtlas:
+    """
+    Packs the small sprites drawn each frame into a few large pages, so a whole
+    layer can be drawn with one Surface.blits call. Sprites that are too large
+    or do not fit anymore are drawn from their own surface.
+
+    Sprites from the graphics caches are placed once per cache key, looked up
+    by surface while the cache holds it, and their region goes when the cache
+    drops them. Other sprites, like animation frames, are placed per surface
+    for as long as the surface lives.
+    """
+
+    def __init__(
+        self,
+        page_size: int = constants.ATLAS_PAGE_SIZE,
+        max_pages: int = constants.ATLAS_MAX_PAGES,
+        max_sprite_size: int = constants.ATLAS_MAX_SPRITE_SIZE,
+    ):
+        self._page_size = page_size
+        self._max_pages = max_pages
+        self._max_sprite_size = max_sprite_size
+        self._pages: List[_Page] = []
+        # by id of a cached surface, valid until its key is evicted
+        self._cached: Dict[int, _Region] = {}
+        self._ids: Dict[Hashable, int] = {}
+        self._uncached: "weakref.WeakKeyDictionary[Surface, _Region]" = (
+            weakref.WeakKeyDictionary()
+        )
+        gfx.on_evict(self._forget)
+
+    def clear(self):
+        self._pages = []
+        self._cached = {}
+        self._ids = {}
+        self._uncached = weakref.WeakKeyDictionary()
+
+    def _forget(self, key: Hashable):
+        surface_id = self._ids.pop(key, None)
+        if surface_id is not None:
+            del self._cached[surface_id]
+
+    def _place(self, image: Surface) -> Optional[_Region]:
+        w, h = image.get_size()
+        if w > self._max_sprite_size or h > self._max_sprite_size:
+            return None
+        if not image.get_flags() & pygame.SRCALPHA:
+            # colorkey and opaque surfaces would lose their transparency on a page
+            return None
+
+        for page in self._pages:
+            x, y = page.place(w, h)
+            if x >= 0:
+                break
+        else:
+            if len(self._pages) >= self._max_pages:
+                return None
+            page = _Page(self._page_size)
+            self._pages.append(page)
+            x, y = page.place(w, h)
+
+        # max blending onto a transparent page copies the pixels, alpha included
+        page.surface.blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        return page.surface, Rect(x, y, w, h)
+
+    def region(self, image: Surface) -> _Region:
+        """ the surface and area to blit image from, the area is None for all of it """
+        region = self._cached.get(id(image))
+        if region is not None:
+            return region
+
+        key = gfx.cache_key(image)
+        if key is None:
+            region = self._uncached.get(image)
+            if region is None:
+                region = self._place(image)
+                if region is None:
+                    return image, None
+                self._uncached[image] = region
+            return region
+
+        # sprites that do not fit are remembered too, the cache holds them anyway
+        region = self._place(image) or (image, None)
+        self._cached[id(image)] = region
+        self._ids[key] = id(image)
+        return region
+
+    @property
+    def pages(self) -> int:
+        return len(self._pages)
+
+    @property
+    def sprites(self) -> int:
+        placed = sum(1 for _, area in self._cached.values() if area is not None)
+        return placed + len(self._uncached)
@@ -1,74 +1,262 @@
 import logging
 import os
-from typing import Dict
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple
 
 import pygame
-from pygame.mixer import Sound
+from pygame.mixer import Channel, Sound
 
 from space_rocks import constants
 from space_rocks.utils import get_random_choice
 
 logger = logging.getLogger(__name__)
 
-_bank: Dict[str, Sound] = {}
 
+class Voice(NamedTuple):
+    priority: int  # higher priorities take channels from lower ones
+    max_instances: int  # of the same sound playing at once
+
+
+class SoundStats(NamedTuple):
+    requested: int
+    played: int
+    merged: int  # requests for a sound that was requested already that frame
+    dropped: int  # over the limit of the sound or no channel to play on
+    stolen: int  # channels stopped for a higher priority sound
+
+
+# critical cues get a reserved channel each, nothing else plays on those
+CRITICAL_SOUNDS = ("game_over", "win_level")
+_LOOP_PRIORITY = 100  # looping sounds such as soundtracks are never cut off
+_DEFAULT_VOICE = Voice(1, constants.SOUND_MAX_INSTANCES)
+_voices: Dict[str, Voice] = {
+    "change_level": Voice(3, 1),
+    "change_weapon": Voice(3, 1),
+    "gradient_start": Voice(2, 1),
+    "gradient_stop": Voice(2, 1),
+    "hurt": Voice(2, 1),
+}
+
+
+class SoundBank(NamedTuple):
+    files: Dict[str, str]  # name: sound file, decoded on first use
+    buffers: Dict[str, Any]  # name: samples in the mixer format, from a pack
+
+
+_files: Dict[str, str] = {}
+_buffers: Dict[str, Any] = {}
+_decoded: "OrderedDict[str, Sound]" = OrderedDict()
+_decoded_bytes = 0
+_requests: Dict[str, bool] = {}  # sound name: repeat, in request order
+_channel_priorities: Dict[int, int] = {}
+_stats = {"requested": 0, "played": 0, "merged": 0, "dropped": 0, "stolen": 0}
+
+
+def load(level_name: str) -> SoundBank:
+    """ finds the sound files of a level, nothing is decoded until it plays """
+    files: Dict[str, str] = {}
 
-def _init(level_name: str):
     def _load_from(path: str):
-        for root, _, files in os.walk(path):
-            for f in files:
+        for root, _, names in os.walk(path):
+            for f in names:
                 f = f.lower()
                 if f.endswith(".wav") or f.endswith(".ogg"):
-                    try:
-                        s = Sound(f"{os.path.join(root, f)}")
-                    except:
-                        s = Sound(f"{constants.SOUND_ASSETS_ROOT}not_found.wav")
                     key = os.path.join(root.replace(path, ""), f)
-                    _bank[key.split(".")[0]] = s
-
-    global _bank
-    _bank = {}
+                    files[key.split(".")[0]] = os.path.join(root, f)
 
     # load level assets
     _load_from(f"{constants.LEVELS_ROOT}{level_name.lower()}/sounds/")
 
     # load default assets
     _load_from(constants.SOUND_ASSETS_ROOT)
+    return SoundBank(files, {})
+
+
+def install(bank: SoundBank):
+    global _files, _buffers
+    stop_all()
+    _files = bank.files
+    _buffers = bank.buffers
+    _drop_decoded()
+    _log_state()
+
+
+def reload(root: str, path: str):
+    """ points a sound at its changed file below root, it is decoded on next use """
+    key = os.path.relpath(path, root).lower().split(".")[0]
+    _buffers.pop(key, None)
+    _forget(key)
+    if os.path.isfile(path):
+        _files[key] = path
+    else:
+        _files.pop(key, None)
+
+
+def _sound_bytes(sound: Sound) -> int:
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+
+def _decode(name: str) -> Sound:
+    if name in _buffers:
+        return Sound(buffer=_buffers[name])
+    try:
+        return Sound(_files[name])
+    except Exception as err:
+        logger.warning(f"sound {name} failed to decode: {err}")
+        return Sound(f"{constants.SOUND_ASSETS_ROOT}not_found.wav")
+
+
+def _sound(name: str) -> Sound:
+    """ the decoded sound, least recently played ones are dropped over the cap """
+    global _decoded_bytes
+    sound = _decoded.get(name)
+    if sound is not None:
+        _decoded.move_to_end(name)
+        return sound
+
+    sound = _decoded[name] = _decode(name)
+    _decoded_bytes += _sound_bytes(sound)
+    max_bytes = constants.SOUND_CACHE_MB * 1024 ** 2
+    for evicted in list(_decoded):
+        if _decoded_bytes <= max_bytes or evicted == name:
+            break
+        # freeing a sound cuts it off, playing ones stay
+        if _decoded[evicted].get_num_channels() == 0:
+            _forget(evicted)
+    return sound
+
+
+def _forget(name: str):
+    global _decoded_bytes
+    sound = _decoded.pop(name, None)
+    if sound is not None:
+        _decoded_bytes -= _sound_bytes(sound)
+
+
+def _drop_decoded():
+    global _decoded_bytes
+    _decoded.clear()
+    _decoded_bytes = 0
+
+
+def decoded_count() -> int:
+    return len(_decoded)
+
+
+def play_music(name: str):
+    """ streams a soundtrack in a loop, next to the sound channels """
+    name = get_random_choice(name)
+    if name not in _files:
+        logger.warning(f"soundtrack {name} not found")
+        return
+    if constants.ENABLE_AUDIO and pygame.mixer.get_init():
+        pygame.mixer.music.load(_files[name])
+        pygame.mixer.music.play(-1)
+
+
+def set_voice(name: str, priority: int, max_instances: int):
+    assert max_instances > 0
+    _voices[name] = Voice(priority, max_instances)
 
 
 def play(name: str, repeat: bool = False):
+    """ requests a sound, requests are merged and played by the next dispatch """
     name = get_random_choice(name)
-    if name not in _bank:
+    if name not in _files and name not in _buffers:
         logger.warning(f"sound {name} not found")
         name = "not_found"
-    if constants.ENABLE_AUDIO:
-        _bank[name].play(1000 if repeat else 0)
+    _stats["requested"] += 1
+    if name in _requests:
+        _stats["merged"] += 1
+        _requests[name] = _requests[name] or repeat
+    else:
+        _requests[name] = repeat
+
+
+def _free_channel(priority: int) -> int:
+    """ an idle channel, else the one playing the lowest priority below priority """
+    lowest, lowest_priority = -1, priority
+    for i in range(len(CRITICAL_SOUNDS), pygame.mixer.get_num_channels()):
+        if not Channel(i).get_busy():
+            return i
+        playing = _channel_priorities.get(i, _DEFAULT_VOICE.priority)
+        if playing < lowest_priority:
+            lowest, lowest_priority = i, playing
+    if lowest >= 0:
+        _stats["stolen"] += 1
+        Channel(lowest).stop()
+    return lowest
+
+
+def _start(name: str, repeat: bool):
+    sound = _sound(name)
+    loops = 1000 if repeat else 0
+    if name in CRITICAL_SOUNDS:
+        Channel(CRITICAL_SOUNDS.index(name)).play(sound, loops)
+        _stats["played"] += 1
+        return
+
+    voice = _voices.get(name, _DEFAULT_VOICE)
+    priority = _LOOP_PRIORITY if repeat else voice.priority
+    if not repeat and sound.get_num_channels() >= voice.max_instances:
+        _stats["dropped"] += 1
+        return
+    i = _free_channel(priority)
+    if i < 0:
+        _stats["dropped"] += 1
+        return
+    Channel(i).play(sound, loops)
+    _channel_priorities[i] = priority
+    _stats["played"] += 1
+
+
+def _priority(name: str) -> int:
+    if _requests[name]:
+        return _LOOP_PRIORITY
+    return _voices.get(name, _DEFAULT_VOICE).priority
+
+
+def dispatch():
+    """ plays this frame's requests, the highest priorities first """
+    if not _requests:
+        return
+    if constants.ENABLE_AUDIO and pygame.mixer.get_init():
+        for name in sorted(_requests, key=_priority, reverse=True):
+            _start(name, _requests[name])
+    _requests.clear()
+
+
+def stats() -> SoundStats:
+    return SoundStats(**_stats)
 
 
 def stop(name: str):
     name = name.lower()
-    if name not in _bank:
-        name = "not_found"
-    _bank[name].stop()
+    _requests.pop(name, None)
+    sound = _decoded.get(name)
+    if sound is not None:
+        sound.stop()
 
 
 def stop_all():
-    for _, v in _bank.items():
-        v.stop()
+    _requests.clear()
+    if pygame.mixer.get_init():
+        pygame.mixer.stop()
+        pygame.mixer.music.stop()
 
 
 def count():
-    return len(_bank)
+    return len(_files.keys() | _buffers.keys())
 
 
 def _log_state():
-    logger.info(f"{len(_bank)} sounds loaded")
-    logger.info(_bank.keys())
+    logger.info(f"{count()} sounds found, {len(_buffers)} of them in a pack")
+    logger.info(_files.keys())
 
 
 def init(level_name: str):
-    _init(level_name)
-    _log_state()
+    install(load(level_name))
 
 
 def init_audio():
@@ -76,6 +264,9 @@ def init_audio():
     # Tried many hthings, perhaps just a pygame limitation
     pygame.mixer.pre_init(44100, -16, 2, 128)
     pygame.init()
+    if pygame.mixer.get_init():
+        pygame.mixer.set_num_channels(constants.SOUND_CHANNELS)
+        pygame.mixer.set_reserved(len(CRITICAL_SOUNDS))
 
     info = pygame.mixer.get_init()
     logger.info(f"Sound Frequency: {info[0]:d}")
@@ -1,4 +1,7 @@
+from typing import Tuple
+
 from pygame.math import Vector2
+from pygame.rect import Rect
 from pygame.surface import Surface
 
 import space_rocks.audio as sounds
@@ -26,14 +29,22 @@ class Background:
     def __init__(self, image_name: str, soundtrack: str):
         self._image_name = image_name
         self._initialize()
-        sounds.play(soundtrack, True)
+        sounds.play_music(soundtrack)
+
+    def position(self, pos: Vector2) -> Tuple[int, int]:
+        # ensures background moves slower than player
+        cx, cy = window.center
+        x = (pos.x - cx) * -0.2 + self._offset[0]
+        y = (pos.y - cy) * -0.2 + self._offset[1]
+        return int(x), int(y)
 
     def draw(self, surface: Surface, pos: Vector2):
-        position = (
-            pos - Vector2(window.center)
-        ) * -0.2  # ensures background moves slower than player
-        position += Vector2(self._offset)
-        surface.blit(self._image, (int(position.x), int(position.y)))
+        surface.blit(self._image, self.position(pos))
+
+    def restore(self, surface: Surface, pos: Vector2, rect: Rect):
+        """ draws only the part of the background under rect """
+        x, y = self.position(pos)
+        surface.blit(self._image, rect, rect.move(-x, -y))
 
     def resize(self):
         self._initialize()
@@ -0,0 +1,233 @@
+"""
+Balance sweeps: runs seeded headless simulations of a level for every
+combination of parameter overrides across a process pool, with an autopilot
+flying the ship, and prints a table of the outcomes per combination.
+
+    $ python -m space_rocks.batch --level 0 --seeds 16 \\
+        --set player.primary_weapon.reload=100,200 --set enemies.*.tiers.0.armor=1,4
+
+Override keys are dotted paths into the level json, see levels.apply_overrides.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from pygame.event import Event
+
+from space_rocks import constants
+from space_rocks.game import Game
+from space_rocks.inputs import Held, Inputs
+from space_rocks.levels import Level
+from space_rocks.models import GameState
+from space_rocks.utils import seed_random, use_simulated_ticks
+
+Overrides = Tuple[Tuple[str, Any], ...]
+
+_AIM_DEGREES = 15  # fires once the target is this close to straight ahead
+
+
+class Autopilot(Inputs):
+    """ turns towards the nearest enemy and fires whenever it is roughly ahead """
+
+    def __init__(self, level: Callable[[], Level]):
+        self._level = level
+        self._idle = Held(0)
+
+    def read(self) -> Tuple[List[Event], Sequence[bool]]:
+        level = self._level()
+        player = level.player
+        if not level.enemies or player.armor <= 0:
+            return [], self._idle
+
+        position = player.geometry.position
+        target = min(
+            (e.geometry.position for e in level.enemies),
+            key=position.distance_squared_to,
+        )
+        angle = player.direction.angle_to(target - position)
+        angle = (angle + 180) % 360 - 180
+        keys = []
+        if abs(angle) > player.maneuverability / constants.SIMULATION_RATE / 2:
+            keys.append(pygame.K_RIGHT if angle > 0 else pygame.K_LEFT)
+        if abs(angle) < _AIM_DEGREES:
+            keys.append(pygame.K_SPACE)
+        return [], Held.of(keys)
+
+
+class Job(NamedTuple):
+    level_id: int
+    overrides: Overrides
+    seed: int
+    max_steps: int
+
+
+class Outcome(NamedTuple):
+    overrides: Overrides
+    seed: int
+    result: str  # cleared, lost or timeout
+    time_to_clear_s: Optional[float]
+    armor_left: float
+    peak_entities: int
+    steps: int
+
+
+_game: Optional[Game] = None  # one per worker process, reused by its jobs
+
+
+def simulate(job: Job) -> Outcome:
+    global _game
+    if _game is None:
+        logging.basicConfig(level=logging.WARNING)
+        _game = Game(headless=True, inputs=Autopilot(lambda: _game.level))
+    game = _game
+
+    game.override_level(job.level_id, job.overrides)
+    seed_random(job.seed)
+    use_simulated_ticks(0)
+    game.set_level(job.level_id)
+    game.start_the_game()
+    game.wait_for_level()
+
+    step_ms = 1000 / constants.SIMULATION_RATE
+    peak = 0
+    steps = 0
+    while game.state is GameState.RUNNING and steps < job.max_steps:
+        steps += 1
+        use_simulated_ticks(int(steps * step_ms))
+        game.tick(draw=False)
+        peak = max(peak, len(game.level.game_objects))
+
+    cleared = game.state is GameState.WON
+    result = {GameState.WON: "cleared", GameState.LOST: "lost"}.get(
+        game.state, "timeout"
+    )
+    return Outcome(
+        job.overrides,
+        job.seed,
+        result,
+        steps / constants.SIMULATION_RATE if cleared else None,
+        max(game.level.player.armor, 0),
+        peak,
+        steps,
+    )
+
+
+def grid(settings: Sequence[str]) -> List[Overrides]:
+    """ every combination of key=value1,value2 settings, values parsed as json """
+    axes = []
+    for setting in settings:
+        key, _, values = setting.partition("=")
+        if not values:
+            raise ValueError(f"{setting} is not key=value[,value...]")
+        axes.append([(key, json.loads(v)) for v in values.split(",")])
+    return [tuple(combination) for combination in itertools.product(*axes)]
+
+
+def run(
+    level_id: int,
+    combinations: Sequence[Overrides],
+    seeds: int,
+    max_seconds: float,
+    workers: Optional[int] = None,
+) -> List[Outcome]:
+    """ seeds simulations per combination, on every core unless workers is set """
+    max_steps = int(max_seconds * constants.SIMULATION_RATE)
+    jobs = [
+        Job(level_id, overrides, seed, max_steps)
+        for overrides in combinations
+        for seed in range(seeds)
+    ]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(simulate, jobs, chunksize=chunksize))
+
+
+def aggregate(outcomes: Sequence[Outcome]) -> List[Dict[str, Any]]:
+    """ one row per combination of overrides, in the order they first appear """
+    runs: Dict[Overrides, List[Outcome]] = {}
+    for o in outcomes:
+        runs.setdefault(o.overrides, []).append(o)
+
+    rows = []
+    for overrides, group in runs.items():
+        times = [o.time_to_clear_s for o in group if o.time_to_clear_s is not None]
+        rows.append(
+            {
+                "overrides": " ".join(f"{k}={v}" for k, v in overrides) or "-",
+                "runs": len(group),
+                "cleared": sum(o.result == "cleared" for o in group) / len(group),
+                "lost": sum(o.result == "lost" for o in group) / len(group),
+                "clear_s_p50": statistics.median(times) if times else None,
+                "clear_s_max": max(times) if times else None,
+                "armor_mean": statistics.fmean(o.armor_left for o in group),
+                "peak_mean": statistics.fmean(o.peak_entities for o in group),
+                "peak_max": max(o.peak_entities for o in group),
+            }
+        )
+    return rows
+
+
+def format_table(rows: Sequence[Dict[str, Any]]) -> str:
+    def cell(value: Any) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
+
+    if not rows:
+        return ""
+    header = list(rows[0])
+    cells = [header] + [[cell(row[k]) for k in header] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(header))]
+    # the overrides column is left aligned, the numbers right aligned
+    lines = [
+        "  ".join(
+            [line[0].ljust(widths[0])]
+            + [c.rjust(w) for c, w in zip(line[1:], widths[1:])]
+        )
+        for line in cells
+    ]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--level", type=int, default=0)
+    parser.add_argument("--seeds", type=int, default=8, help="runs per combination")
+    parser.add_argument(
+        "--set",
+        dest="settings",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="values to sweep for a dotted level json key, repeatable",
+    )
+    parser.add_argument("--max-seconds", type=float, default=180, help="per run")
+    parser.add_argument("--workers", type=int, help="processes, every core by default")
+    parser.add_argument("--json", help="also writes every run as json here")
+    args = parser.parse_args()
+
+    outcomes = run(
+        args.level, grid(args.settings), args.seeds, args.max_seconds, args.workers
+    )
+    print(format_table(aggregate(outcomes)))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([o._asdict() for o in outcomes], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
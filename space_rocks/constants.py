@@ -1,11 +1,57 @@
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 900
-FRAME_RATE = 60
+FRAME_RATE = 60  # render cap, 0 to render as fast as possible
 
 SOUND_ASSETS_ROOT = "assets/sounds/"
 GFX_ASSETS_ROOT = "assets/sprites/"
 ANIM_ASSETS_ROOT = "assets/anim/"
 LEVELS_ROOT = "levels/"
+PACKS_ROOT = "packs/"
+USE_PACKS = True  # levels with an up to date pack load from it
 
 ENABLE_AUDIO = not True
 RESIZABLE_WINDOW = not False
+
+COLLISION_CELL_SIZE = 128
+# vectorized enemy and bullet kinematics, requires numpy
+ENABLE_KINEMATICS_STORE = False
+
+# rotated sprites are cached per ROTATION_STEPS angles, caches evict beyond their cap
+ROTATION_STEPS = 72
+ROTATION_CACHE_MB = 64
+SPRITE_CACHE_MB = 32
+
+# the simulation runs in fixed steps of 1 / SIMULATION_RATE seconds with speeds
+# per second, so the rate trades precision for cost and the game plays the same.
+# Level and animation json give speeds per 1 / JSON_SPEED_RATE seconds.
+SIMULATION_RATE = 60
+JSON_SPEED_RATE = 60
+MAX_CATCH_UP_STEPS = 5
+
+# sprites up to ATLAS_MAX_SPRITE_SIZE are drawn in batches from shared atlas pages
+BATCHED_DRAW = True
+ATLAS_PAGE_SIZE = 2048
+ATLAS_MAX_PAGES = 2
+ATLAS_MAX_SPRITE_SIZE = 256
+
+# only redraw and push the screen areas sprites moved over, while the background
+# stands still and less than DIRTY_AREA_THRESHOLD of the screen changed
+DIRTY_RECTS = False
+DIRTY_AREA_THRESHOLD = 0.4
+
+# level file changes are applied once no event arrived for this long
+HOT_RELOAD_DEBOUNCE_MS = 250
+
+# mixer channels, two of them are reserved for game_over and win_level
+SOUND_CHANNELS = 16
+SOUND_MAX_INSTANCES = 3  # of the same sound at once, unless audio sets its voice
+SOUND_CACHE_MB = 32  # decoded sound effects, soundtracks are streamed
+
+# timing samples kept per section, metrics are written here at exit when set
+METRICS_SAMPLES = 1024
+METRICS_EXPORT_PATH = ""
+
+# profiling mode, toggled with P or started with --profile, see space_rocks.profiler
+PROFILE_PATH = "profile"  # written as profile.trace.json and profile.folded
+PROFILE_SAMPLE_MS = 0.0  # stack sampling interval, 0 takes no samples
+PROFILE_MAX_EVENTS = 1_000_000
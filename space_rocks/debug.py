@@ -1,5 +1,5 @@
 import os
-from typing import Sequence, List
+from typing import Sequence, List, Optional
 
 import psutil
 import pygame
@@ -10,15 +10,19 @@ from pygame.surface import Surface
 import space_rocks.animation as anim
 import space_rocks.audio as sounds
 import space_rocks.graphics as gfx
-from space_rocks.decorators import func_timings
+from space_rocks import metrics
+from space_rocks.atlas import TextureAtlas
+from space_rocks.dirty import DirtyStats
 from space_rocks.models import GameObject
+from space_rocks.pool import PoolStats
 from space_rocks.utils import create_surface_alpha, create_default_font
 from space_rocks.window import window
 
 
 class Debug:
-    def __init__(self, clock: pygame.time.Clock):
+    def __init__(self, clock: pygame.time.Clock, atlas: TextureAtlas):
         self._clock = clock
+        self._atlas = atlas
         self._font = create_default_font(24)
         self.enabled = False
         self._process = psutil.Process(os.getpid())
@@ -37,7 +41,13 @@ class Debug:
             y += 25
 
     def draw_text(
-        self, surface: Surface, position: Vector2, velocity: Vector2, direction: Vector2
+        self,
+        surface: Surface,
+        position: Vector2,
+        velocity: Vector2,
+        direction: Vector2,
+        bullets: PoolStats,
+        dirty: Optional[DirtyStats] = None,
     ):
         if not self.enabled:
             return
@@ -54,9 +64,17 @@ class Debug:
             f"pos: {(round(position.x), round(position.y))} | "
         )
 
-        lines.append("-" * 5 + " function performance " + "-" * 5)
-        for k, v in func_timings.items():
-            lines.append(f"{k}:{v:.2f} ms")
+        lines.append("-" * 5 + " function performance, ms " + "-" * 5)
+        for name in metrics.sections():
+            s = metrics.summary(name)
+            lines.append(
+                f"{name}: p50 {s.p50:.2f} | p95 {s.p95:.2f} | "
+                f"p99 {s.p99:.2f} | max {s.max:.2f}"
+            )
+        buckets = " ".join(
+            f"<={bound:g}:{count}" for bound, count in metrics.histogram() if count
+        )
+        lines.append(f"frames by ms: {buckets}")
 
         lines.append("-" * 5 + " process " + "-" * 5)
         mem_mb = round(self._process.memory_info().rss / 1024 ** 2)
@@ -67,5 +85,35 @@ class Debug:
         lines.append("-" * 5 + " assets " + "-" * 5)
         lines.append(f"images: {gfx.count()}")
         lines.append(f"sounds: {sounds.count()}")
+        voices = sounds.stats()
+        lines.append(
+            f"sound events: {voices.requested} requested | {voices.played} played | "
+            f"{voices.merged} merged | {voices.dropped} dropped | "
+            f"{voices.stolen} stolen"
+        )
         lines.append(f"animations: {anim.count()}")
+        sprites = gfx.cache_stats()
+        lines.append(
+            f"sprites: {sprites.hits} hits | {sprites.misses} misses | "
+            f"{sprites.entries} cached | {round(sprites.bytes / 1024 ** 2)} Mb"
+        )
+        rotations = gfx.rotation_stats()
+        lines.append(
+            f"rotations: {rotations.hits} hits | {rotations.misses} misses | "
+            f"{rotations.entries} cached | {round(rotations.bytes / 1024 ** 2)} Mb"
+        )
+        lines.append(f"masks: {gfx.mask_count()}")
+        atlas = self._atlas
+        lines.append(f"atlas: {atlas.sprites} sprites | {atlas.pages} pages")
+        lines.append("-" * 5 + " pools " + "-" * 5)
+        for name, pool in (("bullets", bullets), ("animations", anim.pool_stats())):
+            lines.append(
+                f"{name}: {pool.in_use} in use | {pool.high_water} high water | "
+                f"{pool.size} pooled | {pool.misses} misses"
+            )
+        if dirty:
+            lines.append(
+                f"dirty: {dirty.rects} rects | {dirty.ratio:.0%} of screen | "
+                f"{'full' if dirty.full else 'partial'} update"
+            )
         self._draw_lines(surface, lines)
\ No newline at end of file
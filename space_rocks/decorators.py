@@ -1,28 +1,30 @@
 import functools
 import time
-from typing import Dict, Callable, Any
+from typing import Callable, Any
 
-func_timings: Dict[str, float] = {}
+from space_rocks import metrics, profiler
 
 
 def register(func: Callable[[Any], Any]):
-    if func.__name__ not in func_timings:
-        func_timings[func.__name__] = 0
+    metrics.register(func.__name__)
     return func
 
 
 def timer(func: Callable[..., Any]):
+    """
+    records the ms of every call in the metrics section named after func, and a
+    span of the same name while profiling
+    """
     register(func)
+    name = func.__name__
 
     @functools.wraps(func)
     def wrapper_timer(*args, **kwargs):
-        start_time = time.perf_counter()
-        value = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        run_time = end_time - start_time
-        func_timings[func.__name__] = (
-            func_timings[func.__name__] + run_time * 1000
-        ) / 2
+        with profiler.span(name):
+            start_time = time.perf_counter()
+            value = func(*args, **kwargs)
+            end_time = time.perf_counter()
+        metrics.record(name, (end_time - start_time) * 1000)
         return value
 
     return wrapper_timer
@@ -0,0 +1,70 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+import pygame
+from pygame.rect import Rect
+
+from space_rocks import constants
+
+
+class DirtyStats(NamedTuple):
+    rects: int
+    area: int  # overlaps are counted for every rect
+    ratio: float  # area relative to the screen
+    full: bool
+
+
+class DirtyRects:
+    """
+    Tracks the screen areas drawn in the previous and in the current frame.
+    A frame then only restores and pushes those areas, unless it has to be
+    drawn in full: after invalidate, when the background scrolled or when the
+    dirty area grows over the threshold.
+    """
+
+    def __init__(self, threshold: float = constants.DIRTY_AREA_THRESHOLD):
+        self._threshold = threshold
+        self._previous: List[Rect] = []
+        self._current: List[Rect] = []
+        self._background_position: Optional[Tuple[int, int]] = None
+        self._full = True
+        self.stats = DirtyStats(0, 0, 0.0, True)
+
+    def invalidate(self):
+        """ the next frame is drawn and pushed in full """
+        self._full = True
+
+    def add(self, rect: Rect):
+        self._current.append(rect)
+
+    def begin(
+        self, screen_size: Tuple[int, int], background_position: Tuple[int, int]
+    ) -> bool:
+        """ decides whether the frame is drawn in full, once all sprites are added """
+        area = sum(r.w * r.h for r in self._previous)
+        area += sum(r.w * r.h for r in self._current)
+        ratio = area / (screen_size[0] * screen_size[1])
+        full = (
+            self._full
+            or background_position != self._background_position
+            or ratio > self._threshold
+        )
+        self._full = full
+        self._background_position = background_position
+        self.stats = DirtyStats(
+            len(self._previous) + len(self._current), area, ratio, full
+        )
+        return full
+
+    @property
+    def rects(self) -> List[Rect]:
+        """ what to restore this frame, where sprites were and where they are now """
+        return self._previous + self._current
+
+    def present(self):
+        if self._full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._previous + self._current)
+        self._previous, self._current = self._current, self._previous
+        self._current.clear()
+        self._full = False
@@ -1,4 +1,8 @@
-from typing import Callable
+import os
+import queue
+import time
+from enum import Enum
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
@@ -6,24 +10,91 @@ from watchdog.observers import Observer
 from space_rocks import constants
 
 
+class AssetKind(Enum):
+    SPRITE = 1
+    SOUND = 2
+    ANIMATION = 3
+    LEVEL = 4
+    SCHEMA = 5
+
+
+class Change(NamedTuple):
+    kind: AssetKind
+    level_name: Optional[str]  # None when the change affects every level
+    path: str
+
+
+_FOLDERS = {
+    "sprites": AssetKind.SPRITE,
+    "sounds": AssetKind.SOUND,
+    "anim": AssetKind.ANIMATION,
+}
+
+
+def classify(path: str) -> Optional[Change]:
+    """ what a changed file below LEVELS_ROOT is, None for anything else """
+    parts = os.path.relpath(path, constants.LEVELS_ROOT).split(os.sep)
+    if parts == ["level_schema.json"]:
+        return Change(AssetKind.SCHEMA, None, path)
+    if len(parts) == 2 and parts[1] == ".json":
+        return Change(AssetKind.LEVEL, parts[0], path)
+    if len(parts) >= 3 and parts[1] in _FOLDERS:
+        return Change(_FOLDERS[parts[1]], parts[0], path)
+    return None
+
+
 class _FileHandler(FileSystemEventHandler):
-    def __init__(self, on_change: Callable[[], None]):
+    def __init__(self, events: "queue.SimpleQueue[Tuple[str, float]]"):
         super(_FileHandler, self).__init__()
-        self._restart_level = on_change
+        self._events = events
 
-    def on_modified(self, event: FileSystemEvent):
-        if event.is_directory:
+    def _changed(self, path: str):
+        if path.endswith("~"):  # seems pycharm gens these temp files, so ignore them
             return
-        if event.src_path.endswith(
-            "~"
-        ):  # seems pycharm gens these temp files, so ignore them
-            return
-        self._restart_level()
+        self._events.put((path, time.monotonic()))
+
+    def on_modified(self, event: FileSystemEvent):
+        if not event.is_directory:
+            self._changed(event.src_path)
+
+    def on_created(self, event: FileSystemEvent):
+        if not event.is_directory:
+            self._changed(event.src_path)
+
+    def on_moved(self, event: FileSystemEvent):
+        # editors that save atomically write a temp file and move it in place
+        if not event.is_directory:
+            self._changed(event.dest_path)
 
 
 class LevelObserver:
-    def __init__(self, on_change: Callable[[], None]):
-        event_handler = _FileHandler(on_change)
+    """
+    Watches the level folders. Events arrive on the watchdog thread and are
+    queued, poll coalesces them per file on the main thread and hands out the
+    files that saw no event for the debounce window, once each.
+    """
+
+    def __init__(self, debounce_ms: int = constants.HOT_RELOAD_DEBOUNCE_MS):
+        self._debounce = debounce_ms / 1000
+        self._events: "queue.SimpleQueue[Tuple[str, float]]" = queue.SimpleQueue()
+        self._pending: Dict[str, float] = {}
+        event_handler = _FileHandler(self._events)
         observer = Observer()
         observer.schedule(event_handler, constants.LEVELS_ROOT, recursive=True)
         observer.start()
+
+    def poll(self) -> Sequence[str]:
+        while True:
+            try:
+                path, at = self._events.get_nowait()
+            except queue.Empty:
+                break
+            self._pending[path] = at
+        if not self._pending:
+            return ()
+
+        now = time.monotonic()
+        settled = [p for p, at in self._pending.items() if now - at >= self._debounce]
+        for path in settled:
+            del self._pending[path]
+        return settled
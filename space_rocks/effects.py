@@ -5,7 +5,7 @@ from pygame.surface import Surface
 
 import space_rocks.audio as sounds
 import space_rocks.graphics as gfx
-from space_rocks.utils import scale_surface, create_surface_alpha
+from space_rocks.utils import scale_surface, create_surface_alpha, get_ticks
 from space_rocks.window import window
 
 
@@ -56,7 +56,7 @@ class GradientEffect:
 class Sun:
     def __init__(self, pos: Vector2):
         self._flip_time_ms = 5000
-        self._start_ticks = pygame.time.get_ticks()
+        self._start_ticks = get_ticks()
         self._darkness = 0
         self._scale = 0.1
         self._growth = True
@@ -64,10 +64,10 @@ class Sun:
         sounds.play("gradient_start")
 
     def move(self):
-        if pygame.time.get_ticks() - self._start_ticks > self._flip_time_ms:
+        if get_ticks() - self._start_ticks > self._flip_time_ms:
             self._growth = not self._growth
             sounds.play("gradient_stop")
-            self._start_ticks = pygame.time.get_ticks()
+            self._start_ticks = get_ticks()
 
         if self._growth:
             if self._darkness < 200:
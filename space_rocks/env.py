@@ -0,0 +1,359 @@
+"""
+Gym style environments for training agents: Env runs one headless game in
+this process, VectorEnv runs n of them in worker processes that write their
+observations into shared memory, so nothing but a byte per step is pickled.
+
+Actions are bit masks of ROTATE_LEFT, ROTATE_RIGHT, ACCELERATE, SHOOT and
+SWITCH_WEAPON. Observations are numpy arrays, see observation_spec. The reward
+of a step is the enemies destroyed, minus the armor lost as a fraction of the
+full armor times ARMOR_WEIGHT, plus CLEAR_REWARD when the level is won and
+minus it when the ship is lost.
+
+    env = Env(level_id=0)
+    obs, info = env.reset(seed=1)
+    obs, reward, terminated, truncated, info = env.step(SHOOT | ROTATE_LEFT)
+"""
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+from pygame.event import Event
+from pygame.surface import Surface
+
+from space_rocks import constants
+from space_rocks.game import Game
+from space_rocks.inputs import Held, Inputs
+from space_rocks.models import GameState
+from space_rocks.player import ActiveWeapon
+from space_rocks.utils import seed_random, use_simulated_ticks
+
+ROTATE_LEFT = 1
+ROTATE_RIGHT = 2
+ACCELERATE = 4
+SHOOT = 8
+SWITCH_WEAPON = 16
+ACTIONS = 32  # every mask is an action
+
+ARMOR_WEIGHT = 10.0
+CLEAR_REWARD = 10.0
+
+Observation = Dict[str, np.ndarray]
+Spec = Dict[str, Tuple[Tuple[int, ...], Any]]
+
+_KEYS = (
+    (ROTATE_LEFT, pygame.K_LEFT),
+    (ROTATE_RIGHT, pygame.K_RIGHT),
+    (ACCELERATE, pygame.K_UP),
+    (SHOOT, pygame.K_SPACE),
+)
+
+
+def observation_spec(
+    max_enemies: int, max_bullets: int, frame_size: Optional[Tuple[int, int]]
+) -> Spec:
+    """
+    shape and dtype per observation array:
+    player: x, y, vx, vy, direction x, direction y, armor, secondary weapon
+    enemies, up to max_enemies: x, y, vx, vy, radius, armor, zeros after the last
+    bullets, up to max_bullets: x, y, vx, vy, zeros after the last
+    counts: enemies and bullets, also those that did not fit
+    frame: the screen scaled to frame_size, rgb, only with a frame_size
+    """
+    spec: Spec = {
+        "player": ((8,), np.float32),
+        "enemies": ((max_enemies, 6), np.float32),
+        "bullets": ((max_bullets, 4), np.float32),
+        "counts": ((2,), np.int32),
+    }
+    if frame_size:
+        spec["frame"] = ((frame_size[1], frame_size[0], 3), np.uint8)
+    return spec
+
+
+class _ActionInputs(Inputs):
+    """ the keys of the current action, a weapon switch is a key press """
+
+    def __init__(self):
+        self.action = 0
+
+    def read(self) -> Tuple[List[Event], Held]:
+        held = Held.of(key for bit, key in _KEYS if self.action & bit)
+        if self.action & SWITCH_WEAPON:
+            return [Event(pygame.KEYDOWN, key=pygame.K_1)], held
+        return [], held
+
+
+class Env:
+    """
+    One headless game. Observations are written into the same arrays every
+    step, pass buffers to have them written somewhere else.
+    """
+
+    def __init__(
+        self,
+        level_id: int = 0,
+        max_steps: int = 60 * constants.SIMULATION_RATE,
+        max_enemies: int = 64,
+        max_bullets: int = 64,
+        frame_size: Optional[Tuple[int, int]] = None,
+        buffers: Optional[Observation] = None,
+    ):
+        self.level_id = level_id
+        self.max_steps = max_steps
+        self.spec = observation_spec(max_enemies, max_bullets, frame_size)
+        self._obs = buffers or {
+            k: np.zeros(shape, dtype) for k, (shape, dtype) in self.spec.items()
+        }
+        self._inputs = _ActionInputs()
+        self._game = Game(headless=True, inputs=self._inputs)
+        self._frame: Optional[Surface] = (
+            Surface(frame_size).convert() if frame_size else None
+        )
+        self._steps = 0
+        self._destroyed = 0
+        self._armor = 0.0
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Observation, Dict[str, Any]]:
+        if seed is not None:
+            seed_random(seed)
+        use_simulated_ticks(0)
+        self._inputs.action = 0
+        self._game.set_level(self.level_id)
+        self._game.start_the_game()
+        self._game.wait_for_level()
+        self._steps = 0
+        self._destroyed = 0
+        self._armor = self._game.level.player.armor
+        self._observe()
+        return self._obs, {}
+
+    def step(
+        self, action: int
+    ) -> Tuple[Observation, float, bool, bool, Dict[str, Any]]:
+        game = self._game
+        self._inputs.action = int(action)
+        self._steps += 1
+        use_simulated_ticks(self._steps * 1000 // constants.SIMULATION_RATE)
+        game.tick(draw=self._frame is not None)
+
+        level = game.level
+        player = level.player
+        full_armor = player.properties.armor
+        reward = float(level.enemies_destroyed - self._destroyed)
+        reward -= ARMOR_WEIGHT * (self._armor - max(player.armor, 0)) / full_armor
+        self._destroyed = level.enemies_destroyed
+        self._armor = max(player.armor, 0)
+        terminated = game.state in (GameState.WON, GameState.LOST)
+        if game.state is GameState.WON:
+            reward += CLEAR_REWARD
+        elif game.state is GameState.LOST:
+            reward -= CLEAR_REWARD
+        truncated = not terminated and self._steps >= self.max_steps
+
+        self._observe()
+        return self._obs, reward, terminated, truncated, {"steps": self._steps}
+
+    def _observe(self):
+        obs = self._obs
+        level = self._game.level
+        player = level.player
+        g = player.geometry
+        obs["player"][:] = (
+            g.position.x,
+            g.position.y,
+            g.velocity.x,
+            g.velocity.y,
+            player.direction.x,
+            player.direction.y,
+            player.armor,
+            player.active_weapon is ActiveWeapon.SECONDARY,
+        )
+
+        enemies = obs["enemies"]
+        rows = [
+            (
+                e.geometry.position.x,
+                e.geometry.position.y,
+                e.geometry.velocity.x,
+                e.geometry.velocity.y,
+                e.geometry.radius,
+                e.armor,
+            )
+            for e in level.enemies[: len(enemies)]
+        ]
+        _fill(enemies, rows)
+        bullets = obs["bullets"]
+        rows = [
+            (
+                b.geometry.position.x,
+                b.geometry.position.y,
+                b.geometry.velocity.x,
+                b.geometry.velocity.y,
+            )
+            for b in level.bullets[: len(bullets)]
+        ]
+        _fill(bullets, rows)
+        obs["counts"][:] = (len(level.enemies), len(level.bullets))
+
+        if self._frame is not None:
+            pygame.transform.smoothscale(
+                self._game.screen, self._frame.get_size(), self._frame
+            )
+            # surfarray is indexed x first
+            obs["frame"][:] = pygame.surfarray.pixels3d(self._frame).swapaxes(0, 1)
+
+
+def _fill(array: np.ndarray, rows: List[Tuple[float, ...]]):
+    if rows:
+        array[: len(rows)] = rows
+    array[len(rows) :] = 0
+
+
+_Layout = Dict[str, Tuple[int, Tuple[int, ...], Any]]  # offset, shape, dtype
+
+
+def _layout(n: int, spec: Spec) -> Tuple[_Layout, int]:
+    """ where each array with a row per env goes in the shared block, and its size """
+    arrays = dict(spec)
+    arrays["action"] = ((), np.int32)
+    arrays["reward"] = ((), np.float32)
+    arrays["terminated"] = ((), np.bool_)
+    arrays["truncated"] = ((), np.bool_)
+    layout = {}
+    offset = 0
+    for name, (shape, dtype) in arrays.items():
+        shape = (n, *shape)
+        offset = -(-offset // 8) * 8
+        layout[name] = (offset, shape, dtype)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+def _views(memory: SharedMemory, layout: _Layout) -> Dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, dtype, buffer=memory.buf, offset=offset)
+        for name, (offset, shape, dtype) in layout.items()
+    }
+
+
+def _worker(
+    memory_name: str,
+    layout: _Layout,
+    index: int,
+    seed: int,
+    env_args: Dict[str, Any],
+    connection: Connection,
+):
+    """ runs the env of row index until told to close, the process ends with it """
+    memory = SharedMemory(memory_name)
+    views = _views(memory, layout)
+    spec = observation_spec(
+        env_args["max_enemies"], env_args["max_bullets"], env_args["frame_size"]
+    )
+    env = Env(buffers={name: views[name][index] for name in spec}, **env_args)
+    episodes = 0
+    while True:
+        command = connection.recv_bytes()
+        if command == b"r":
+            episodes = 0
+            env.reset(seed)
+        elif command == b"s":
+            _, reward, terminated, truncated, _ = env.step(views["action"][index])
+            views["reward"][index] = reward
+            views["terminated"][index] = terminated
+            views["truncated"][index] = truncated
+            if terminated or truncated:
+                # the next episode starts right away, as in gym vector envs
+                episodes += 1
+                env.reset(seed + episodes * 1_000_003)
+        else:
+            break
+        connection.send_bytes(b"")
+
+
+class VectorEnv:
+    """
+    n Env in worker processes, stepped together. Observations, actions and
+    rewards are arrays with one row per env in one shared memory block; what
+    reset and step return is overwritten by the next step. An env that ends
+    an episode starts the next one in the same step, its terminated or
+    truncated is set and its observation is the first of the new episode.
+    """
+
+    def __init__(
+        self,
+        n: int = os.cpu_count() or 1,
+        seed: int = 0,
+        level_id: int = 0,
+        max_steps: int = 60 * constants.SIMULATION_RATE,
+        max_enemies: int = 64,
+        max_bullets: int = 64,
+        frame_size: Optional[Tuple[int, int]] = None,
+    ):
+        self.n = n
+        self.spec = observation_spec(max_enemies, max_bullets, frame_size)
+        layout, size = _layout(n, self.spec)
+        self._memory = SharedMemory(create=True, size=size)
+        self._views = _views(self._memory, layout)
+        self._obs = {name: self._views[name] for name in self.spec}
+        env_args = {
+            "level_id": level_id,
+            "max_steps": max_steps,
+            "max_enemies": max_enemies,
+            "max_bullets": max_bullets,
+            "frame_size": frame_size,
+        }
+        self._connections: List[Connection] = []
+        self._workers: List[multiprocessing.Process] = []
+        for i in range(n):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_worker,
+                args=(self._memory.name, layout, i, seed + i, env_args, child),
+                daemon=True,
+            )
+            worker.start()
+            self._connections.append(parent)
+            self._workers.append(worker)
+
+    def _command(self, command: bytes):
+        for c in self._connections:
+            c.send_bytes(command)
+        for c in self._connections:
+            c.recv_bytes()
+
+    def reset(self) -> Tuple[Observation, Dict[str, Any]]:
+        """ (re)starts every env with the seed of the VectorEnv plus its row """
+        self._command(b"r")
+        return self._obs, {}
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[Observation, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        self._views["action"][:] = actions
+        self._command(b"s")
+        return (
+            self._obs,
+            self._views["reward"],
+            self._views["terminated"],
+            self._views["truncated"],
+            {},
+        )
+
+    def close(self):
+        for c in self._connections:
+            c.send_bytes(b"c")
+        for w in self._workers:
+            w.join()
+        self._obs = {}
+        self._views = {}
+        self._memory.close()
+        self._memory.unlink()
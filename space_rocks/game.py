@@ -1,86 +1,267 @@
 import logging
-from typing import List
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import pygame
+from pygame.math import Vector2
+from pygame.rect import Rect
+from pygame.surface import Surface
 
 import space_rocks.animation as anim
 import space_rocks.audio as sounds
 import space_rocks.graphics as gfx
-from space_rocks import constants
+from space_rocks import constants, metrics, profiler
+from space_rocks.atlas import TextureAtlas
 from space_rocks.debug import Debug
+from space_rocks.dirty import DirtyRects, DirtyStats
 from space_rocks.decorators import timer
-from space_rocks.editing import LevelObserver
+from space_rocks.editing import AssetKind, Change, LevelObserver, classify
 from space_rocks.hud import HUD
-from space_rocks.levels import Level, World
+from space_rocks.inputs import LEVEL_START, Inputs
+from space_rocks.levels import (
+    Level,
+    LevelAssets,
+    World,
+    install_assets,
+    load_assets,
+)
 from space_rocks.menu import Menu
 from space_rocks.models import GameState
 from space_rocks.ui import UI
 from space_rocks.utils import (
     is_in_screen,
     collides_with,
-    sprite_collide,
+    get_blit_position,
+    mask_collide,
     init_display,
+    init_headless_display,
     init_fonts,
+    use_simulated_ticks,
 )
 from space_rocks.window import window
 
+logger = logging.getLogger(__name__)
+
+_Blit = Tuple[Surface, Tuple[int, int], Optional[Rect]]
+
 
 class Game:
     def set_level(self, level: int):
         self._world.set_current_level(level)
 
+    def override_level(self, level: int, overrides: Sequence[Tuple[str, Any]]):
+        self._world.override_level(level, overrides)
+
+    def replace_level(self, level: int, data: Optional[Dict[str, Any]]):
+        self._world.replace_level(level, data)
+
     def start_the_game(self):
+        level_id, _ = self._world.get_current_level()
+        self._inputs.level_started(level_id)
         self._initialize_level()
 
-    def __init__(self):
+    def __init__(
+        self,
+        headless: bool = False,
+        inputs: Optional[Inputs] = None,
+        screen_size: Tuple[int, int] = (
+            constants.SCREEN_WIDTH,
+            constants.SCREEN_HEIGHT,
+        ),
+    ):
+        """ screen_size is only used headless, the window is full screen """
         logging.basicConfig(level=logging.INFO)
-        LevelObserver(self._initialize_level)
+        self._observer = None if headless else LevelObserver()
+        if constants.METRICS_EXPORT_PATH:
+            metrics.export_at_exit(constants.METRICS_EXPORT_PATH)
+        self._inputs = inputs or Inputs()
         sounds.init_audio()
         init_fonts()
-        self._screen = init_display()
+        self._screen = (
+            init_headless_display(screen_size) if headless else init_display()
+        )
         window.resize()
 
         self._state = GameState.NOT_RUNNING
         self._clock = pygame.time.Clock()
-        self._debug = Debug(self._clock)
+        self._atlas = TextureAtlas()
+        self._debug = Debug(self._clock, self._atlas)
         self._ui = UI()
         self._hud = HUD()
         self._world = World(self._screen)
         self._level: Level
-        self._effects: List[anim.Animation]
+        self._effects: List[anim.Animation] = []
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self._loading: Optional["Future[LevelAssets]"] = None
+        self._loading_stage = ""
+        self._object_batch: List[_Blit] = []
+        self._effect_batch: List[_Blit] = []
+        self._dirty = DirtyRects()
+        self._drawn_state = self._state
         self._menu = Menu(
             self.set_level,
             self.start_the_game,
             self._world.get_all_levels(),
         )
-        self._menu.menu.mainloop(self._screen)
+        if not headless:
+            self._menu.menu.mainloop(self._screen)
 
     def _initialize_level(self):
+        """ starts loading the current level in the background """
         self._state = GameState.LOADING_LEVEL
         sounds.stop_all()
-        level_id, level_name = self._world.get_current_level()
-        sounds.init(level_name)
+        _, level_name = self._world.get_current_level()
+        self._loading_stage = ""
+        self._loading = self._loader.submit(self._load_level, level_name)
+
+    def _set_loading_stage(self, stage: str):
+        self._loading_stage = stage
+
+    def _load_level(self, level_name: str) -> LevelAssets:
+        """ runs on the loader thread, so it only decodes """
+        assets = self._world.take_prefetched(level_name)
+        if assets is None:
+            assets = load_assets(level_name, self._set_loading_stage)
+        return assets
+
+    def _finish_loading(self):
+        """ swaps the assets and builds the level, on the main thread """
+        assert self._loading
+        assets = self._loading.result()
+        self._loading = None
+        install_assets(assets)
+        level_id, _ = self._world.get_current_level()
+        self._run_level(self._world.start_level(level_id, assets.level_data))
+
+    def _run_level(self, level: Level):
+        self._level = level
+        for e in self._effects:
+            anim.release(e)
+        self._effects.clear()
+        self._atlas.clear()
+        self._dirty.invalidate()
         sounds.play("change_level")
-        gfx.init(level_name)
-        anim.init(level_name)
-        self._level = self._world.start_level(level_id)
-        self._effects = []
         self._state = GameState.RUNNING
+        self._world.prefetch_next_level()
+
+    def _poll_loading(self):
+        """ keeps the window responsive and shows progress while a level loads """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit()
+        self._screen.fill((0, 0, 0))
+        self._ui.draw(self._screen, self._state, self._loading_stage)
+        sounds.dispatch()
+        pygame.display.flip()
+        self._clock.tick(constants.FRAME_RATE)
+        if self._loading and self._loading.done():
+            self._finish_loading()
+
+    def wait_for_level(self):
+        """ blocks until the level that is being loaded is running """
+        if self._loading:
+            self._loading.result()
+            self._finish_loading()
+
+    @property
+    def level(self) -> Level:
+        return self._level
+
+    @property
+    def screen(self) -> Surface:
+        return self._screen
+
+    @property
+    def level_id(self) -> int:
+        level_id, _ = self._world.get_current_level()
+        return level_id
+
+    @property
+    def state(self) -> GameState:
+        return self._state
+
+    @property
+    def dirty_stats(self) -> DirtyStats:
+        """ dirty rect stats of the last frame drawn with DIRTY_RECTS """
+        return self._dirty.stats
 
     def main_loop(self):
+        """
+        Fixed timestep loop: the simulation advances in steps of 1/SIMULATION_RATE
+        seconds, at most MAX_CATCH_UP_STEPS per rendered frame, and rendering
+        interpolates between the last two simulation steps.
+        """
+        step_ms = 1000 / constants.SIMULATION_RATE
+        sim_ticks = 0.0
+        use_simulated_ticks(0)
+        accumulator = 0.0
+        previous = time.perf_counter()
         while True:
             if self._state is GameState.LOADING_LEVEL:
+                self._poll_loading()
+                previous = time.perf_counter()
+                continue
+            now = time.perf_counter()
+            metrics.record_frame((now - previous) * 1000)
+            accumulator += (now - previous) * 1000
+            accumulator = min(accumulator, step_ms * constants.MAX_CATCH_UP_STEPS)
+            previous = now
+
+            # a step that starts loading a level is the last one until it is loaded
+            while accumulator >= step_ms and self._state is not GameState.LOADING_LEVEL:
+                sim_ticks += step_ms
+                use_simulated_ticks(int(sim_ticks))
+                self._step()
+                accumulator -= step_ms
+            if self._state is GameState.LOADING_LEVEL:
+                # the old level's assets are about to be swapped out
                 continue
-            self._handle_input()
-            self._process_game_logic()
-            self._draw()
-            self._cleanup()
+
+            with profiler.span("audio"):
+                sounds.dispatch()
+            self._draw(accumulator / step_ms)
             self._clock.tick_busy_loop(constants.FRAME_RATE)
 
+    def tick(self, draw: bool = True, timings: Optional[Dict[str, float]] = None):
+        """
+        One simulation step and one frame, adds the ms per phase to timings.
+        A level load triggered by the step completes before this returns.
+        """
+        start = time.perf_counter()
+        self._step(timings)
+        if self._state is GameState.LOADING_LEVEL:
+            self.wait_for_level()
+        with profiler.span("audio"):
+            sounds.dispatch()
+        if draw:
+            self._timed(self._draw, timings)
+        metrics.record_frame((time.perf_counter() - start) * 1000)
+
+    def _step(self, timings: Optional[Dict[str, float]] = None):
+        self._timed(self._handle_input, timings)
+        if self._state is GameState.LOADING_LEVEL:
+            return
+        self._timed(self._process_game_logic, timings)
+        self._timed(self._cleanup, timings)
+
+    def _timed(self, phase: Callable[[], None], timings: Optional[Dict[str, float]]):
+        if timings is None:
+            phase()
+            return
+        start = time.perf_counter()
+        phase()
+        name = phase.__name__.lstrip("_")
+        timings[name] = timings.get(name, 0) + (time.perf_counter() - start) * 1000
+
     def _resize(self):
         window.resize()
+        gfx.invalidate()
+        self._atlas.clear()
+        self._dirty.invalidate()
         for go in self._level.game_objects:
             go.resize()
+        self._level.enemy_grid.update_all(self._level.enemies)
 
         self._menu = Menu(
             self.set_level,
@@ -88,11 +269,61 @@ class Game:
             self._world.get_all_levels(),
         )
 
+    def _hot_reload(self):
+        """ applies the level files that changed, one at a time """
+        if self._observer is None:
+            return
+        for path in self._observer.poll():
+            change = classify(path)
+            if change is None:
+                continue
+            start = time.perf_counter()
+            if self._apply_change(change):
+                ms = (time.perf_counter() - start) * 1000
+                kind = change.kind.name.lower()
+                logger.info(f"{kind} {path} reloaded in {ms:.1f} ms")
+
+    def _apply_change(self, change: Change) -> bool:
+        """ reloads what change touched, False when it was kept as it is """
+        level_id, level_name = self._world.get_current_level()
+        if change.level_name not in (None, level_name):
+            # prefetched assets may hold the old file
+            self._world.discard_prefetched()
+            self._world.prefetch_next_level()
+            return False
+
+        level_root = f"{constants.LEVELS_ROOT}{level_name.lower()}/"
+        if change.kind is AssetKind.SPRITE:
+            gfx.reload(f"{level_root}sprites/", change.path)
+            self._atlas.clear()
+            for o in self._level.game_objects:
+                o.reload_image()
+            self._level.background.resize()
+            self._dirty.invalidate()
+        elif change.kind is AssetKind.SOUND:
+            sounds.reload(f"{level_root}sounds/", change.path)
+        elif change.kind is AssetKind.ANIMATION:
+            anim.reload(change.path)
+        else:
+            # the level json or the schema, only the level starts over
+            try:
+                level = self._world.start_level(level_id)
+            except (SystemExit, ValueError):
+                logger.warning(f"{change.path} is invalid, keeping the running level")
+                return False
+            self._run_level(level)
+        return True
+
     @timer
     def _handle_input(self):
-        for event in pygame.event.get():
+        self._hot_reload()
+        events, is_key_pressed = self._inputs.read()
+        for event in events:
             if event.type == pygame.QUIT:
                 quit()
+            elif event.type == LEVEL_START:
+                self.set_level(event.level)
+                self.start_the_game()
             elif event.type == pygame.VIDEORESIZE:
                 pass
             elif event.type == pygame.VIDEOEXPOSE:
@@ -102,10 +333,16 @@ class Game:
                 if event.key == pygame.K_ESCAPE:
                     self._menu.menu.enable()
                     self._menu.menu.mainloop(self._screen)
+                    self._dirty.invalidate()
 
                 # for debugging
                 if event.key == pygame.K_q:
                     self._debug.enabled = not self._debug.enabled
+                    self._dirty.invalidate()
+                if event.key == pygame.K_p:
+                    profiler.toggle()
+                if event.key == pygame.K_m:
+                    metrics.export(constants.METRICS_EXPORT_PATH or "metrics.json")
                 if event.key == pygame.K_z:
                     self._state = GameState.WON
                 if event.key == pygame.K_7:
@@ -130,7 +367,6 @@ class Game:
                         self._world.set_current_level(0)
                         self._initialize_level()
 
-        is_key_pressed = pygame.key.get_pressed()
         if self._state is GameState.RUNNING and self._level.player:
             if is_key_pressed[pygame.K_RIGHT] or is_key_pressed[pygame.K_d]:
                 self._level.player.rotate(clockwise=True)
@@ -143,17 +379,43 @@ class Game:
 
     @timer
     def _process_game_logic(self):
-        for e in self._effects:
-            e.move()
+        with profiler.span("move.effects"):
+            for e in self._effects:
+                e.move()
+
+        level = self._level
+        for game_object in level.game_objects:
+            game_object.remember_position()
+        if level.kinematics:
+            with profiler.span("move.kinematics"):
+                level.kinematics.step(self._screen)
+        with profiler.span("move.enemies"):
+            for enemy in level.enemies:
+                enemy.move(self._screen)
+        with profiler.span("move.bullets"):
+            for bullet in level.bullets:
+                bullet.move(self._screen)
+        with profiler.span("move.player"):
+            level.player.move(self._screen)
+        with profiler.span("grid"):
+            level.enemy_grid.update_all(level.enemies)
 
-        for game_object in self._level.game_objects:
-            game_object.move(self._screen)
+        with profiler.span("collisions.player"):
+            self._collide_player()
+        with profiler.span("collisions.bullets"):
+            self._collide_bullets()
 
+    def _collide_player(self):
         player = self._level.player
         if player and not player.armor <= 0:
-            for a in list(self._level.enemies):
+            for a in self._level.enemy_grid.query(player.geometry):
                 if collides_with(player.geometry, a.geometry):
-                    if sprite_collide(player, a):
+                    if mask_collide(
+                        player.mask,
+                        player.geometry.position,
+                        a.mask,
+                        a.geometry.position,
+                    ):
                         player_geo = player.geometry
                         player.hit(a.geometry, a.damage)
                         if player.armor <= 0:
@@ -165,8 +427,9 @@ class Game:
                             self._level.remove_enemy(a)
                         break
 
-        for b in list(self._level.bullets):
-            for a in list(self._level.enemies):
+    def _collide_bullets(self):
+        for b in self._level.bullets:
+            for a in self._level.enemy_grid.query(b.geometry):
                 if collides_with(a.geometry, b.geometry):
                     a.hit(b.geometry, b.damage)
                     if a.armor <= 0:
@@ -175,28 +438,55 @@ class Game:
                     self._level.remove_bullet(b)
                     break
 
-        if not self._level.enemies and self._level.player:
-            self._state = GameState.WON
-
     @timer
-    def _draw(self):
-        self._level.background.draw(self._screen, self._level.player.geometry.position)
-
+    def _draw(self, alpha: float = 1.0):
         for o in self._level.game_objects:
-            o.draw(self._screen)
+            o.interpolate(alpha)
+        batch = self._object_batch
+        with profiler.span("frames.enemies"):
+            for o in self._level.enemies:
+                self._add_to_batch(batch, o.frame_image(), o.render_position)
+        with profiler.span("frames.bullets"):
+            for o in self._level.bullets:
+                self._add_to_batch(batch, o.frame_image(), o.render_position)
+        with profiler.span("frames.player"):
+            player = self._level.player
+            self._add_to_batch(batch, player.frame_image(), player.render_position)
+        with profiler.span("frames.effects"):
+            for e in self._effects:
+                self._add_to_batch(self._effect_batch, e.frame_image(), e.position)
 
-        for e in self._effects:
-            e.draw(self._screen)
+        background = self._level.background
+        player_position = self._level.player.render_position
+        dirty = self._dirty if constants.DIRTY_RECTS else None
+        if self._state is not self._drawn_state or self._debug.enabled:
+            self._dirty.invalidate()
+            self._drawn_state = self._state
+        with profiler.span("background"):
+            if dirty is None or dirty.begin(
+                self._screen.get_size(), background.position(player_position)
+            ):
+                background.draw(self._screen, player_position)
+            else:
+                for rect in dirty.rects:
+                    background.restore(self._screen, player_position, rect)
+
+        with profiler.span("blits.objects"):
+            self._draw_batch(self._object_batch)
+        with profiler.span("blits.effects"):
+            self._draw_batch(self._effect_batch)
 
         self._debug.draw_text(
             self._screen,
             self._level.player.geometry.position,
             self._level.player.geometry.velocity,
             self._level.player.direction,
+            self._level.bullet_pool.stats,
+            self._dirty.stats if dirty else None,
         )
 
         _, level_name = self._world.get_current_level()
-        self._hud.draw(
+        hud_rect = self._hud.draw(
             self._screen,
             self._level.player.armor,
             self._level.player.damage,
@@ -204,15 +494,59 @@ class Game:
             level_name,
         )
 
-        self._ui.draw(self._screen, self._state)
+        ui_rect = self._ui.draw(self._screen, self._state)
 
-        pygame.display.flip()
+        with profiler.span("present"):
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                dirty.add(hud_rect)
+                dirty.add(ui_rect)
+                dirty.present()
+
+    def _add_to_batch(
+        self, batch: List[_Blit], image: Optional[Surface], position: Vector2
+    ):
+        if image is None:
+            return
+        dest = get_blit_position(image, position)
+        if constants.DIRTY_RECTS:
+            self._dirty.add(Rect(dest, image.get_size()))
+        if constants.BATCHED_DRAW:
+            source, area = self._atlas.region(image)
+            batch.append((source, dest, area))
+        else:
+            batch.append((image, dest, None))
+
+    def _draw_batch(self, batch: List[_Blit]):
+        """ one blits call per layer, sprites mostly come from the same atlas page """
+        if constants.BATCHED_DRAW:
+            self._screen.blits(batch, doreturn=False)
+        else:
+            for source, dest, _ in batch:
+                self._screen.blit(source, dest)
+        batch.clear()
 
     def _cleanup(self):
-        for b in list(self._level.bullets):
-            if not is_in_screen(self._screen, b.geometry):
+        if self._level.kinematics:
+            for b in self._level.kinematics.culled(self._screen):
                 self._level.remove_bullet(b)
+        else:
+            for b in self._level.bullets:
+                if not is_in_screen(self._screen, b.geometry):
+                    self._level.remove_bullet(b)
 
-        for e in list(self._effects):
+        effects = self._effects
+        kept = 0
+        for e in effects:
             if e.complete:
-                self._effects.remove(e)
+                anim.release(e)
+            else:
+                effects[kept] = e
+                kept += 1
+        del effects[kept:]
+
+        # everything removed this tick leaves the level here, at the end of it
+        self._level.apply_removals()
+        if not self._level.enemies and self._level.player:
+            self._state = GameState.WON
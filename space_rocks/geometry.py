@@ -2,9 +2,12 @@ from pygame.math import Vector2
 
 
 class Geometry:
+    __slots__ = ("_velocity", "_position", "_radius")
+
     def __init__(self, position: Vector2, radius: float, velocity: Vector2) -> None:
-        self._velocity: Vector2 = velocity
-        self._position: Vector2 = position
+        # copies, so in place updates never leak into vectors shared by the caller
+        self._velocity: Vector2 = Vector2(velocity)
+        self._position: Vector2 = Vector2(position)
         self._radius: float = radius
 
     @property
@@ -24,3 +27,19 @@ class Geometry:
 
     def update_vel(self, velocity: Vector2):
         return Geometry(self.position, self.radius, velocity)
+
+    def set_pos(self, x: float, y: float):
+        self._position.x = x
+        self._position.y = y
+
+    def set_vel(self, x: float, y: float):
+        self._velocity.x = x
+        self._velocity.y = y
+
+    def advance(self, seconds: float):
+        self._position.x += self._velocity.x * seconds
+        self._position.y += self._velocity.y * seconds
+
+    def accelerate(self, direction: Vector2, amount: float):
+        self._velocity.x += direction.x * amount
+        self._velocity.y += direction.y * amount
@@ -1,19 +1,103 @@
 import logging
 import os
-from typing import Dict, Optional, Tuple
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
 
+import pygame
+from pygame.mask import Mask
 from pygame.surface import Surface
 
 from space_rocks import constants
 from space_rocks.utils import (
     scale_surface,
+    scale_and_rotate,
     get_random_choice,
     create_surface_from_image,
 )
 
 logger = logging.getLogger(__name__)
 
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+
+def _surface_bytes(surface: Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SurfaceCache:
+    """
+    LRU cache of derived surfaces, bounded by the pixel memory it holds. key_of
+    tells the (name, key) of a surface while it is cached.
+    """
+
+    def __init__(self, max_bytes: int, name: str = ""):
+        assert max_bytes > 0
+        self._max_bytes = max_bytes
+        self._name = name
+        self._entries: "OrderedDict[Hashable, Surface]" = OrderedDict()
+        self._keys: Dict[int, Hashable] = {}  # by surface id, the entries hold them
+        self._listeners: List["weakref.WeakMethod[Callable[[Hashable], None]]"] = []
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, create: Callable[..., Surface], *args: Any) -> Surface:
+        """ the surface of key, made by create(*args) when it is not cached """
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return surface
+
+        self._misses += 1
+        surface = create(*args)
+        self._entries[key] = surface
+        self._keys[id(surface)] = (self._name, key)
+        self._bytes += _surface_bytes(surface)
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= _surface_bytes(evicted)
+            del self._keys[id(evicted)]
+            self._evicted(evicted_key)
+        return surface
+
+    def key_of(self, surface: Surface) -> Optional[Hashable]:
+        return self._keys.get(id(surface))
+
+    def on_evict(self, listener: Callable[[Hashable], None]):
+        """ calls the bound method listener with (name, key) of each dropped entry """
+        self._listeners.append(weakref.WeakMethod(listener))
+
+    def _evicted(self, key: Hashable):
+        for ref in self._listeners:
+            listener = ref()
+            if listener is not None:
+                listener((self._name, key))
+
+    def clear(self):
+        for key in self._entries:
+            self._evicted(key)
+        self._entries.clear()
+        self._keys.clear()
+        self._listeners = [ref for ref in self._listeners if ref() is not None]
+        self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, len(self._entries), self._bytes)
+
+
 _bank: Dict[str, Surface] = {}
+_rotations = SurfaceCache(constants.ROTATION_CACHE_MB * 1024 ** 2, "rotated")
+_derived = SurfaceCache(constants.SPRITE_CACHE_MB * 1024 ** 2, "derived")
+# a mask lives as long as its surface, so it goes when the caches drop the surface
+_masks: "weakref.WeakKeyDictionary[Surface, Mask]" = weakref.WeakKeyDictionary()
 
 
 #
@@ -30,7 +114,10 @@ _bank: Dict[str, Surface] = {}
 #     return pygame.image.fromstring(img_bytes, img.size, img.mode)
 
 
-def _init(level_name: str) -> None:
+def load(level_name: str) -> Dict[str, Surface]:
+    """ decodes the sprites of a level without touching the active ones """
+    bank: Dict[str, Surface] = {}
+
     def _load_from(path: str):
         for root, _, files in os.walk(path):
             for f in files:
@@ -43,27 +130,126 @@ def _init(level_name: str) -> None:
                             f"{constants.GFX_ASSETS_ROOT}not_found.png"
                         )
                     key = os.path.join(root.replace(path, ""), f)
-                    _bank[key.split(".")[0]] = g
+                    bank[key.split(".")[0]] = g
 
-    global _bank
-    _bank = {}
-    # load default assets
+    # load level assets
     _load_from(f"{constants.LEVELS_ROOT}{level_name.lower()}/sprites/")
     # load default assets
     _load_from(constants.GFX_ASSETS_ROOT)
+    return bank
+
+
+def install(bank: Dict[str, Surface]):
+    global _bank
+    _bank = bank
+    invalidate()
+    _log_state()
+
+
+def reload(root: str, path: str):
+    """ decodes one changed sprite file below root into the active sprites """
+    key = os.path.relpath(path, root).lower().split(".")[0]
+    if not os.path.isfile(path):
+        _bank.pop(key, None)
+    else:
+        try:
+            _bank[key] = create_surface_from_image(path)
+        except Exception as err:
+            logger.warning(f"keeping sprite {key}, {path} failed to load: {err}")
+            return
+    invalidate()
 
 
 def get(
-    name: str, with_alpha: bool = True, resize: Optional[Tuple[int, int]] = None
+    name: str,
+    with_alpha: bool = True,
+    resize: Optional[Tuple[int, int]] = None,
+    scale: Optional[float] = None,
 ) -> Surface:
+    """ shared by every caller with the same arguments, scale zooms after resize """
     name = get_random_choice(name)
     if name not in _bank:
         logger.warning(f"sprite {name} not found")
         name = "not_found"
-    loaded_sprite = _bank[name]
-    if resize:
-        loaded_sprite = scale_surface(loaded_sprite, resize)
-    return loaded_sprite.convert_alpha() if with_alpha else loaded_sprite.convert()
+
+    def create() -> Surface:
+        loaded_sprite = _bank[name]
+        if resize:
+            loaded_sprite = scale_surface(loaded_sprite, resize)
+        converted = (
+            loaded_sprite.convert_alpha() if with_alpha else loaded_sprite.convert()
+        )
+        if scale is not None:
+            converted = scale_and_rotate(converted, 0, scale)
+        return converted
+
+    return _derived.get((name, resize, with_alpha, scale), create)
+
+
+def get_rotated(
+    key: Hashable, image: Surface, angle: float, scale: float = 1
+) -> Surface:
+    """
+    image rotated by angle, snapped to one of ROTATION_STEPS angles. Surfaces
+    are shared by everything that passes the same key, e.g. the sprite name.
+    """
+    steps = constants.ROTATION_STEPS
+    step = round(angle % 360 * steps / 360) % steps
+    # no closure, this runs for every rotating sprite every frame
+    return _rotations.get(
+        (key, image.get_size(), scale, step),
+        scale_and_rotate,
+        image,
+        step * 360 / steps,
+        scale,
+    )
+
+
+def warm_rotations(key: Hashable, image: Surface, scale: float = 1):
+    """ fills the rotation cache for every step of image up front """
+    steps = constants.ROTATION_STEPS
+    for step in range(steps):
+        get_rotated(key, image, step * 360 / steps, scale)
+
+
+def get_mask(surface: Surface) -> Mask:
+    """
+    collision mask of surface, made once per surface. The cached sprites and
+    rotations are shared, so that is once per sprite, scale and rotation step.
+    """
+    mask = _masks.get(surface)
+    if mask is None:
+        mask = _masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+
+def cache_key(surface: Surface) -> Optional[Hashable]:
+    """ what surface is cached under, None when get or get_rotated do not hold it """
+    return _rotations.key_of(surface) or _derived.key_of(surface)
+
+
+def on_evict(listener: Callable[[Hashable], None]):
+    """ tells the bound method listener the cache_key of every dropped surface """
+    _rotations.on_evict(listener)
+    _derived.on_evict(listener)
+
+
+def mask_count() -> int:
+    return len(_masks)
+
+
+def rotation_stats() -> CacheStats:
+    return _rotations.stats
+
+
+def cache_stats() -> CacheStats:
+    return _derived.stats
+
+
+def invalidate():
+    """ drops every derived surface, e.g. when the window size changes """
+    _derived.clear()
+    _rotations.clear()
 
 
 def count():
@@ -76,5 +262,4 @@ def _log_state():
 
 
 def init(level_name: str):
-    _init(level_name)
-    _log_state()
+    install(load(level_name))
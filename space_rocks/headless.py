@@ -0,0 +1,98 @@
+"""
+Runs a level without a window or sound device, with seeded randomness and a
+fixed number of frames, and prints ticks per second and phase timings as json.
+
+    $ python -m space_rocks.headless --level 0 --frames 600 --seed 1 --no-draw
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import space_rocks.animation as anim
+from space_rocks import constants, metrics, profiler
+from space_rocks.game import Game
+from space_rocks.utils import seed_random, use_simulated_ticks
+
+
+def run(
+    level_id: int = 0, frames: int = 600, seed: int = 0, draw: bool = True
+) -> Dict[str, Any]:
+    game = Game(headless=True)
+    seed_random(seed)
+    use_simulated_ticks(0)
+    game.set_level(level_id)
+    game.start_the_game()
+    game.wait_for_level()
+
+    timings: Dict[str, float] = {}
+    peak_entities = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        use_simulated_ticks(frame * 1000 // constants.SIMULATION_RATE)
+        game.tick(draw, timings)
+        peak_entities = max(peak_entities, len(game.level.game_objects))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "level": level_id,
+        "seed": seed,
+        "frames": frames,
+        "draw": draw,
+        "elapsed_s": round(elapsed, 4),
+        "ticks_per_second": round(frames / elapsed, 1),
+        "phases": {
+            name: {"total_ms": round(total, 3), "mean_ms": round(total / frames, 4)}
+            for name, total in timings.items()
+        },
+        "entities": {
+            "enemies": len(game.level.enemies),
+            "bullets": len(game.level.bullets),
+            "peak": peak_entities,
+        },
+        "pools": {
+            "bullets": game.level.bullet_pool.stats._asdict(),
+            "animations": anim.pool_stats()._asdict(),
+        },
+        "state": game.state.name,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--level", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-draw", dest="draw", action="store_false")
+    parser.add_argument("--metrics", help="exports timing metrics, .json or .csv")
+    parser.add_argument(
+        "--profile", metavar="PATH", help="writes PATH.trace.json and PATH.folded"
+    )
+    parser.add_argument(
+        "--profile-sample",
+        type=float,
+        default=constants.PROFILE_SAMPLE_MS,
+        metavar="MS",
+        help="also samples the call stack every MS while profiling",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.profile:
+        profiler.start(args.profile_sample)
+    result = run(args.level, args.frames, args.seed, args.draw)
+    if args.profile:
+        profiler.stop(args.profile)
+    print(json.dumps(result, indent=2))
+    if args.metrics:
+        metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,10 @@ class UIRect:
         self._surface.fill(color)
         self._rect = rect
 
+    @property
+    def rect(self) -> Rect:
+        return self._rect
+
     def draw(self, surface: Surface):
         surface.blit(self._surface, (self._rect.x, self._rect.y))
 
@@ -58,7 +62,8 @@ class HUD:
         damage: float,
         weapon: ActiveWeapon,
         level_name: str,
-    ):
+    ) -> Rect:
+        """ draws the HUD and returns the area it covers """
         self._background.draw(screen)
 
         armor_color = self._red if armor < 10 else self._white
@@ -66,6 +71,7 @@ class HUD:
         self._damage.draw(screen, f"👊{damage}")
         self._weapon.draw(screen, "🔫" if weapon == ActiveWeapon.PRIMARY else "🚀")
         self._level.draw(screen, f"{level_name}")
+        return self._background.rect
 
     def resize(self):
         pass
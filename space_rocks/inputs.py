@@ -0,0 +1,207 @@
+"""
+Where Game reads its input from, once per simulation step: the keyboard, the
+keyboard while recording it, or a recording played back by space_rocks.replay.
+
+A recording holds the level id, the seed, the screen size and, per step, the
+held keys and key presses. Layout: MAGIC, the header length as little endian
+u64, the json header and then the zlib compressed steps.
+"""
+import atexit
+import json
+import logging
+import struct
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import pygame
+from pygame.event import Event
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SRINPUT1"
+HEADER = struct.Struct("<Q")
+_STEP = struct.Struct("<BH")  # held keys, events
+_EVENT = struct.Struct("<BI")  # kind, key or level id
+_KEYDOWN = 0
+_LEVEL_START = 1
+
+# the keys Game reads as held down, bit i of the held mask is HELD_KEYS[i]
+HELD_KEYS = (
+    pygame.K_RIGHT,
+    pygame.K_d,
+    pygame.K_LEFT,
+    pygame.K_a,
+    pygame.K_UP,
+    pygame.K_w,
+    pygame.K_SPACE,
+)
+_BITS: Dict[int, int] = {key: 1 << i for i, key in enumerate(HELD_KEYS)}
+
+# replayed where the recorded session started a level from the menu
+LEVEL_START = pygame.event.custom_type()
+
+
+class Step(NamedTuple):
+    held: int
+    events: List[Tuple[int, int]]  # (kind, key or level id)
+
+
+class Recording(NamedTuple):
+    level_id: int
+    seed: int
+    screen_size: Tuple[int, int]
+    steps: List[Step]
+
+
+def save(path: str, recording: Recording):
+    body = bytearray()
+    for held, events in recording.steps:
+        body += _STEP.pack(held, len(events))
+        for kind, value in events:
+            body += _EVENT.pack(kind, value)
+    header = json.dumps(
+        {
+            "level": recording.level_id,
+            "seed": recording.seed,
+            "screen": list(recording.screen_size),
+            "steps": len(recording.steps),
+        }
+    ).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(header)))
+        f.write(header)
+        f.write(zlib.compress(bytes(body)))
+
+
+def load(path: str) -> Recording:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an input recording")
+    start = len(MAGIC) + HEADER.size
+    (header_length,) = HEADER.unpack_from(data, len(MAGIC))
+    header = json.loads(data[start : start + header_length])
+    body = zlib.decompress(data[start + header_length :])
+
+    steps: List[Step] = []
+    offset = 0
+    for _ in range(header["steps"]):
+        held, count = _STEP.unpack_from(body, offset)
+        offset += _STEP.size
+        events = list(_EVENT.iter_unpack(body[offset : offset + count * _EVENT.size]))
+        offset += count * _EVENT.size
+        steps.append(Step(held, events))
+    screen = header["screen"]
+    return Recording(header["level"], header["seed"], (screen[0], screen[1]), steps)
+
+
+class Held:
+    """ looked up like pygame.key.get_pressed, for the HELD_KEYS """
+
+    def __init__(self, mask: int):
+        self._mask = mask
+
+    @classmethod
+    def of(cls, keys: Iterable[int]) -> "Held":
+        mask = 0
+        for key in keys:
+            mask |= _BITS[key]
+        return cls(mask)
+
+    def __getitem__(self, key: int) -> bool:
+        return bool(self._mask & _BITS.get(key, 0))
+
+
+class Inputs:
+    """ the keyboard """
+
+    def read(self) -> Tuple[List[Event], Sequence[bool]]:
+        """ the events since the last step and the keys held down now """
+        return pygame.event.get(), pygame.key.get_pressed()
+
+    def level_started(self, level_id: int):
+        pass
+
+    @property
+    def finished(self) -> bool:
+        return False
+
+
+class RecordingInputs(Inputs):
+    """
+    The keyboard, recorded into path when the game exits. The menu is not
+    recorded, only the levels it starts. seed is what the game was seeded with.
+    """
+
+    def __init__(self, path: str, seed: int):
+        self._path = path
+        self._seed = seed
+        self._level_id: Optional[int] = None
+        self._screen_size = (0, 0)
+        self._steps: List[Step] = []
+        self._closed = False
+        atexit.register(self.close)
+
+    def read(self) -> Tuple[List[Event], Sequence[bool]]:
+        events, pressed = super(RecordingInputs, self).read()
+        if any(e.type == pygame.QUIT for e in events):
+            # the game quits before this step runs, so it is not part of the session
+            self.close()
+            return events, pressed
+
+        held = 0
+        for key, bit in _BITS.items():
+            if pressed[key]:
+                held |= bit
+        self._steps.append(
+            Step(
+                held,
+                [
+                    (_KEYDOWN, e.key)
+                    for e in events
+                    if e.type == pygame.KEYDOWN and e.key != pygame.K_ESCAPE
+                ],
+            )
+        )
+        return events, pressed
+
+    def level_started(self, level_id: int):
+        if self._level_id is None:
+            self._level_id = level_id
+            self._screen_size = pygame.display.get_surface().get_size()
+        elif self._steps:
+            self._steps[-1].events.append((_LEVEL_START, level_id))
+
+    def close(self):
+        if self._closed or self._level_id is None:
+            return
+        self._closed = True
+        recording = Recording(
+            self._level_id, self._seed, self._screen_size, self._steps
+        )
+        save(self._path, recording)
+        logger.info(f"{len(self._steps)} steps recorded into {self._path}")
+
+
+class ReplayInputs(Inputs):
+    """ the steps of a recording, one per read """
+
+    def __init__(self, recording: Recording):
+        self._steps = recording.steps
+        self._next = 0
+
+    def read(self) -> Tuple[List[Event], Sequence[bool]]:
+        held, events = self._steps[self._next]
+        self._next += 1
+        return [self._event(kind, value) for kind, value in events], Held(held)
+
+    @staticmethod
+    def _event(kind: int, value: int) -> Event:
+        if kind == _LEVEL_START:
+            return Event(LEVEL_START, level=value)
+        return Event(pygame.KEYDOWN, key=value)
+
+    @property
+    def finished(self) -> bool:
+        return self._next >= len(self._steps)
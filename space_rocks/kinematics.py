@@ -0,0 +1,210 @@
+import logging
+from typing import Any, List, Optional
+
+from pygame.math import Vector2
+from pygame.surface import Surface
+
+from space_rocks import constants
+from space_rocks.geometry import Geometry
+from space_rocks.models import GameObject
+from space_rocks.utils import step_seconds
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, objects then keep their own geometry
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def is_available() -> bool:
+    return np is not None and constants.ENABLE_KINEMATICS_STORE
+
+
+class ReadOnlyVector(Vector2):
+    """
+    Position or velocity of a stored object. Writing to it would not reach the
+    store, so it raises instead. Vectors computed from it are read only too,
+    Vector2(v) makes a copy that can be changed.
+    """
+
+    __slots__ = ()
+
+    def _refuse(self, *args: Any, **kwargs: Any):
+        raise TypeError(
+            "the vectors of stored geometry are read only, use set_pos or set_vel"
+        )
+
+    __setattr__ = __setitem__ = _refuse
+    __iadd__ = __isub__ = __imul__ = __itruediv__ = __ifloordiv__ = _refuse
+    update = scale_to_length = normalize_ip = reflect_ip = _refuse
+    rotate_ip = rotate_rad_ip = clamp_magnitude_ip = move_towards_ip = _refuse
+
+
+class StoredGeometry(Geometry):
+    """
+    The geometry of a stored object, kept for as long as it is stored. Reads
+    come from the row of the object and set_pos, set_vel, advance and
+    accelerate write to it. position and velocity are the same two vectors on
+    every read, refreshed by it.
+    """
+
+    __slots__ = ("_store", "_object")
+
+    def __init__(self, store: "KinematicsStore", obj: GameObject):
+        self._store = store
+        self._object = obj
+        self._position = ReadOnlyVector()
+        self._velocity = ReadOnlyVector()
+
+    @property
+    def position(self) -> Vector2:
+        x, y = self._store._position[self._object.row]
+        Vector2.update(self._position, x, y)
+        return self._position
+
+    @property
+    def velocity(self) -> Vector2:
+        x, y = self._store._velocity[self._object.row]
+        Vector2.update(self._velocity, x, y)
+        return self._velocity
+
+    @property
+    def radius(self) -> float:
+        return float(self._store._radius[self._object.row])
+
+    def set_pos(self, x: float, y: float):
+        self._store._position[self._object.row] = x, y
+
+    def set_vel(self, x: float, y: float):
+        self._store._velocity[self._object.row] = x, y
+
+    def advance(self, seconds: float):
+        row = self._object.row
+        self._store._position[row] += self._store._velocity[row] * seconds
+
+    def accelerate(self, direction: Vector2, amount: float):
+        velocity = self._store._velocity[self._object.row]
+        velocity[0] += direction.x * amount
+        velocity[1] += direction.y * amount
+
+
+class KinematicsStore:
+    """
+    Structure of arrays for positions, velocities and radii of game objects.
+    Stored objects read and write their geometry through a row of the store,
+    and the whole store is integrated, bounced and culled in vectorized passes.
+    """
+
+    def __init__(self, capacity: int = 256):
+        assert np is not None
+        self._count = 0
+        self._objects: List[GameObject] = []
+        self._position = np.zeros((capacity, 2))
+        self._velocity = np.zeros((capacity, 2))
+        self._radius = np.zeros(capacity)
+        self._edge_offset = np.zeros(capacity)
+        self._velocity_decrease = np.ones(capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self):
+        capacity = len(self._radius) * 2
+        self._position = np.resize(self._position, (capacity, 2))
+        self._velocity = np.resize(self._velocity, (capacity, 2))
+        self._radius = np.resize(self._radius, capacity)
+        self._edge_offset = np.resize(self._edge_offset, capacity)
+        self._velocity_decrease = np.resize(self._velocity_decrease, capacity)
+
+    def attach(
+        self, obj: GameObject, edge_offset: float = 0, velocity_decrease: float = 1
+    ):
+        """
+        an edge_offset of 0 means the object flies off screen instead of
+        bouncing
+        """
+        assert edge_offset >= 0
+        assert 0 < velocity_decrease <= 1
+        if self._count == len(self._radius):
+            self._grow()
+
+        row = self._count
+        self._count += 1
+        self._objects.append(obj)
+        self._edge_offset[row] = edge_offset
+        self._velocity_decrease[row] = velocity_decrease
+        self.set_geometry(row, obj.geometry)
+        obj.attach(self, row, StoredGeometry(self, obj))
+
+    def detach(self, obj: GameObject):
+        row = obj.row
+        obj.detach(self.geometry(row))
+
+        last = self._count - 1
+        if row != last:
+            moved = self._objects[last]
+            self._objects[row] = moved
+            self._position[row] = self._position[last]
+            self._velocity[row] = self._velocity[last]
+            self._radius[row] = self._radius[last]
+            self._edge_offset[row] = self._edge_offset[last]
+            self._velocity_decrease[row] = self._velocity_decrease[last]
+            moved.row = row
+        self._objects.pop()
+        self._count = last
+
+    def geometry(self, row: int) -> Geometry:
+        """ a copy of the row, for objects that leave the store """
+        x, y = self._position[row]
+        vx, vy = self._velocity[row]
+        return Geometry(Vector2(x, y), float(self._radius[row]), Vector2(vx, vy))
+
+    def set_geometry(self, row: int, geometry: Geometry):
+        self._position[row] = geometry.position.x, geometry.position.y
+        self._velocity[row] = geometry.velocity.x, geometry.velocity.y
+        self._radius[row] = geometry.radius
+
+    def step(self, surface: Surface):
+        """
+        same semantics as utils.bounce_edge, applied to every bouncing row at
+        once
+        """
+        n = self._count
+        position = self._position[:n]
+        velocity = self._velocity[:n]
+        position += velocity * step_seconds()
+
+        w, h = surface.get_size()
+        e = self._edge_offset[:n]
+        bounces = e > 0
+        vel_decrease_threshold = constants.JSON_SPEED_RATE
+        factor = np.where(
+            np.abs(velocity) < vel_decrease_threshold,
+            -1.0,
+            -self._velocity_decrease[:n, None],
+        )
+        hit_x = bounces & ((position[:, 0] >= w - e) | (position[:, 0] <= e))
+        hit_y = bounces & ((position[:, 1] >= h - e) | (position[:, 1] <= e))
+        velocity[hit_x, 0] *= factor[hit_x, 0]
+        velocity[hit_y, 1] *= factor[hit_y, 1]
+
+    def culled(self, surface: Surface) -> List[GameObject]:
+        """ non bouncing objects that left the screen """
+        n = self._count
+        position = self._position[:n]
+        w, h = surface.get_size()
+        outside = (
+            (position[:, 0] < 0)
+            | (position[:, 0] >= w)
+            | (position[:, 1] < 0)
+            | (position[:, 1] >= h)
+        ) & (self._edge_offset[:n] == 0)
+        return [self._objects[i] for i in np.flatnonzero(outside)]
+
+
+def create_store() -> Optional[KinematicsStore]:
+    if not is_available():
+        return None
+    logger.info("using numpy kinematics store")
+    return KinematicsStore()
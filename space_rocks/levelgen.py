@@ -0,0 +1,117 @@
+"""
+Generates stress levels: schema valid level json with as many enemies, tiers,
+children, and as fast ships and weapons as a scaling test needs. Sprites,
+sounds and animations are taken from a template level, so the generated json
+runs with that level's assets.
+
+    $ python -m space_rocks.levelgen --scenario 1k -o stress_1k.json
+    $ python -m space_rocks.levelgen --enemies 500 --tiers 3 --children 4 -o x.json
+
+benchmarks/stress.py runs the SCENARIOS.
+"""
+import argparse
+import copy
+import json
+from typing import Any, Dict, List, NamedTuple
+
+from space_rocks import constants
+from space_rocks.levels import read_level_json, validate_level_json
+
+TEMPLATE = f"{constants.LEVELS_ROOT}0_level1/.json"
+
+
+class StressParams(NamedTuple):
+    enemies: int = 10  # at the start, every one of them the top tier
+    tiers: int = 2
+    children: int = 2  # enemies of the next tier a destroyed one splits into
+    min_velocity: int = 1
+    max_velocity: int = 4
+    max_rotation: int = 5
+    scale: float = 1.0  # of the top tier, every tier below is half the size
+    armor: int = 1
+    damage: int = 1
+    reload: int = 200  # ms of the primary weapon, the secondary takes 4 times longer
+    player_armor: int = 1_000_000  # so stress runs do not end early
+
+
+# named by the enemies on screen when the level starts
+SCENARIOS: Dict[str, StressParams] = {
+    "100": StressParams(enemies=100, tiers=2, children=2, reload=100),
+    "1k": StressParams(enemies=1000, tiers=2, children=2, scale=0.5, reload=50),
+    "10k": StressParams(enemies=10000, tiers=1, children=0, scale=0.25, reload=50),
+}
+
+
+def max_enemies(params: StressParams) -> int:
+    """ enemies alive at once when every enemy is split before any bottom one dies """
+    return params.enemies * params.children ** (params.tiers - 1)
+
+
+def generate(params: StressParams, template: Dict[str, Any]) -> Dict[str, Any]:
+    """ level json for params, with the assets template uses """
+    assert params.enemies > 0 and params.tiers > 0
+    player = copy.deepcopy(template["player"])
+    player["armor"] = params.player_armor
+    player["primary_weapon"]["reload"] = params.reload
+    player["secondary_weapon"]["reload"] = params.reload * 4
+
+    looks = [t for e in template["enemies"] for t in e["tiers"]]
+    enemies: List[Dict[str, Any]] = []
+    for i in range(params.enemies):
+        tiers = []
+        for depth in range(params.tiers):
+            look = looks[(i + depth) % len(looks)]
+            tiers.append(
+                {
+                    "damage": params.damage,
+                    "armor": params.armor,
+                    "max_velocity": params.max_velocity,
+                    "min_velocity": params.min_velocity,
+                    "max_rotation": params.max_rotation,
+                    "scale": params.scale * 0.5 ** depth,
+                    "children": params.children if depth < params.tiers - 1 else 0,
+                    "sound_on_destroy": look["sound_on_destroy"],
+                    "sound_on_impact": look["sound_on_impact"],
+                    "image": look["image"],
+                    "anim_on_destroy": look["anim_on_destroy"],
+                }
+            )
+        enemies.append({"tiers": tiers})
+
+    data = {
+        "background": template["background"],
+        "soundtrack": template["soundtrack"],
+        "player": player,
+        "enemies": enemies,
+    }
+    validate_level_json(data)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS, help="start from these params")
+    for name, default in StressParams._field_defaults.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default))
+    parser.add_argument(
+        "--template", default=TEMPLATE, help="level json to take the assets from"
+    )
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    params = SCENARIOS[args.scenario] if args.scenario else StressParams()
+    params = params._replace(
+        **{
+            name: getattr(args, name)
+            for name in StressParams._fields
+            if getattr(args, name) is not None
+        }
+    )
+    data = generate(params, read_level_json(args.template))
+    with open(args.output, "w") as f:
+        json.dump(data, f, indent=1)
+    print(f"{args.output}: {params}, up to {max_enemies(params)} enemies at once")
+
+
+if __name__ == "__main__":
+    main()
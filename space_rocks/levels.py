@@ -1,14 +1,21 @@
+import copy
+import hashlib
 import json
 import logging
+import math
 import os
-from typing import Any, List, Sequence, Tuple, Callable, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Callable, Dict
 
 import jsonschema
-from jsonschema import validate
 from pygame import Vector2
 from pygame.surface import Surface
 
-from space_rocks import constants
+import space_rocks.animation as anim
+import space_rocks.audio as sounds
+import space_rocks.graphics as gfx
+from space_rocks import constants, packs
+from space_rocks.kinematics import KinematicsStore, create_store
 from space_rocks.background import Background
 from space_rocks.models import (
     Enemy,
@@ -18,106 +25,360 @@ from space_rocks.models import (
     GameObject,
 )
 from space_rocks.player import PlayerProperties, Player
+from space_rocks.pool import Pool
+from space_rocks.spatial import SpatialGrid
 from space_rocks.utils import get_safe_enemy_distance
 from space_rocks.window import window
 
 logger = logging.getLogger(__name__)
 
 
-def _load_schema() -> str:
-    with open(f"{constants.LEVELS_ROOT}level_schema.json", "r") as read_file:
-        return json.load(read_file)
+class LevelAssets(NamedTuple):
+    sounds: sounds.SoundBank
+    sprites: Dict[str, Surface]
+    animations: anim.AnimationBank
+    level_data: Optional[Dict[str, Any]] = None  # validated json, from a pack
+
+
+def load_assets(
+    level_name: str, progress: Callable[[str], None] = lambda _: None
+) -> LevelAssets:
+    """ decodes all assets of a level, safe to run off the main thread """
+    pack = packs.read(level_name) if constants.USE_PACKS else None
+    if pack:
+        progress("pack")
+        level_sounds = sounds.load(level_name)
+        if pack.sounds is not None:
+            level_sounds = level_sounds._replace(buffers=pack.sounds)
+        return LevelAssets(level_sounds, pack.sprites, pack.animations, pack.level_data)
+
+    progress("sounds")
+    level_sounds = sounds.load(level_name)
+    progress("sprites")
+    sprites = gfx.load(level_name)
+    progress("animations")
+    animations = anim.load(level_name)
+    return LevelAssets(level_sounds, sprites, animations)
+
+
+def install_assets(assets: LevelAssets):
+    sounds.install(assets.sounds)
+    gfx.install(assets.sprites)
+    anim.install(assets.animations)
+
+
+class _Schema(NamedTuple):
+    mtime_ns: int
+    digest: str
+    validator: Any
+
+
+_schema: Optional[_Schema] = None
+
+
+def _current_schema() -> _Schema:
+    """ the checked and compiled level schema, reloaded when its file changes """
+    global _schema
+    path = f"{constants.LEVELS_ROOT}level_schema.json"
+    mtime_ns = os.stat(path).st_mtime_ns
+    if _schema is None or _schema.mtime_ns != mtime_ns:
+        with open(path, "rb") as read_file:
+            raw = read_file.read()
+        schema = json.loads(raw)
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        _schema = _Schema(
+            mtime_ns, hashlib.sha256(raw).hexdigest(), validator_class(schema)
+        )
+    return _schema
+
+
+def read_level_json(json_path: str) -> Dict[str, Any]:
+    with open(json_path, "r") as read_file:
+        data = json.load(read_file)
+
+        try:
+            _current_schema().validator.validate(data)
+        except jsonschema.exceptions.ValidationError as err:
+            logger.error(f"invalid json at: {json_path}: " + err.message)
+            raise SystemExit
+
+        logger.info(f"{json_path} loaded and appears valid")
+        return data
+
+
+def apply_overrides(
+    data: Dict[str, Any], overrides: Sequence[Tuple[str, Any]]
+) -> Dict[str, Any]:
+    """
+    A validated copy of level json with values replaced. Keys are dotted paths
+    like player.primary_weapon.reload or enemies.*.tiers.0.armor, where * is
+    every item of a list. Raises ValueError for paths or values that do not fit.
+    """
+    data = copy.deepcopy(data)
+    for path, value in overrides:
+        keys = path.split(".")
+        nodes: List[Any] = [data]
+        for key in keys[:-1]:
+            nodes = [child for node in nodes for child in _children(node, key, path)]
+        for node in nodes:
+            _children(node, keys[-1], path)  # the key must exist already
+            node[int(keys[-1]) if isinstance(node, list) else keys[-1]] = value
+    try:
+        validate_level_json(data)
+    except ValueError as err:
+        raise ValueError(f"overrides {overrides} make the level invalid: {err}")
+    return data
+
+
+def validate_level_json(data: Dict[str, Any]):
+    """ raises ValueError when data does not match the level schema """
+    try:
+        _current_schema().validator.validate(data)
+    except jsonschema.exceptions.ValidationError as err:
+        raise ValueError(err.message)
+
+
+def _children(node: Any, key: str, path: str) -> List[Any]:
+    if isinstance(node, list):
+        if key == "*":
+            return node
+        if key.isdigit() and int(key) < len(node):
+            return [node[int(key)]]
+    elif isinstance(node, dict) and key in node:
+        return [node[key]]
+    raise ValueError(f"{path} does not match the level json at {key}")
+
+
+class CompiledLevel(NamedTuple):
+    player: PlayerProperties
+    enemies: List[Dict[int, EnemyProperties]]  # properties per tier, per enemy
+    background: str
+    soundtrack: str
+
+
+def _weapon(w: Dict[str, Any]) -> BulletProperties:
+    weapon = BulletProperties(
+        w["damage"],
+        w["speed"] * constants.JSON_SPEED_RATE,
+        w["sound"],
+        w["reload"],
+        w["image"],
+    )
+    weapon.validate()
+    return weapon
+
+
+def compile_level(data: Dict[str, Any]) -> CompiledLevel:
+    """
+    resolves validated level json into the property tuples levels start from,
+    with its speeds per JSON_SPEED_RATE step turned into speeds per second
+    """
+    rate = constants.JSON_SPEED_RATE
+    player = data["player"]
+    player_props = PlayerProperties(
+        player["damage"],
+        player["armor"],
+        player["maneuverability"] * rate,
+        player["acceleration"] * rate * rate,
+        player["sound_on_impact"],
+        player["image"],
+        player["anim_on_destroy"],
+        _weapon(player["primary_weapon"]),
+        _weapon(player["secondary_weapon"]),
+    )
+    player_props.validate()
+
+    enemies: List[Dict[int, EnemyProperties]] = []
+    for a in data["enemies"]:
+        enemy_props = {}
+        c = len(a["tiers"])
+        for t in a["tiers"]:
+            p = EnemyProperties(
+                t["damage"],
+                t["armor"],
+                t["max_velocity"] * rate,
+                t["min_velocity"] * rate,
+                t["max_rotation"] * rate,
+                t["scale"],
+                t["children"],
+                t["sound_on_destroy"],
+                t["sound_on_impact"],
+                t["image"],
+                t["anim_on_destroy"],
+            )
+            p.validate()
+            enemy_props[c] = p
+            c = c - 1
+        enemies.append(enemy_props)
 
+    return CompiledLevel(player_props, enemies, data["background"], data["soundtrack"])
 
-class Level:
-    _schema = _load_schema()
 
-    def _load_level(self, json_path: str):
-        with open(json_path, "r") as read_file:
-            data = json.load(read_file)
+_CompiledKey = Tuple[int, str]  # mtime of the level json, schema digest
+_compiled: Dict[str, Tuple[_CompiledKey, CompiledLevel]] = {}
+
+
+def compiled_level(
+    json_path: str, data: Optional[Dict[str, Any]] = None
+) -> CompiledLevel:
+    """
+    The compiled level at json_path, parsed, validated and compiled only when
+    the file or the schema changed since the last call. data is json that was
+    validated already, from a pack.
+    """
+    key = (os.stat(json_path).st_mtime_ns, _current_schema().digest)
+    cached = _compiled.get(json_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    if data is None:
+        data = read_level_json(json_path)
+    level = compile_level(data)
+    _compiled[json_path] = (key, level)
+    return level
+
 
-            try:
-                validate(instance=data, schema=self._schema)
-            except jsonschema.exceptions.ValidationError as err:
-                logger.error(f"invalid json at: {json_path}: " + err.message)
-                raise SystemExit
+def clear_compiled_levels():
+    _compiled.clear()
 
-            logger.info(f"{json_path} loaded and appears valid")
-            return data
 
-    def __init__(self, screen: Surface, json_path: str):
+def _bullets_in_flight(screen: Surface, weapon: BulletProperties) -> int:
+    """ most bullets of a weapon on screen at once, firing nonstop across it """
+    w, h = screen.get_size()
+    ms = math.hypot(w, h) / weapon.speed * 1000
+    return int(ms // weapon.reload) + 1
+
+
+class EntityRegistry:
+    """
+    Owns the game objects of a level in dense lists, one per kind and one with
+    all of them. Every object gets a handle that is never reused, so a stale
+    handle resolves to None. Removals are deferred until apply_removals, which
+    swap removes in O(1), so the views can be iterated while objects are
+    removed, and they are returned as they are without copies.
+    """
+
+    def __init__(self):
+        self._next_handle = 0
+        self._objects: Dict[int, GameObject] = {}
+        self._enemies: List[Enemy] = []
         self._bullets: List[Bullet] = []
-        data = self._load_level(json_path)
-        player = data["player"]
-        prim = player["primary_weapon"]
-        primary_weapon = BulletProperties(
-            prim["damage"],
-            prim["speed"],
-            prim["sound"],
-            prim["reload"],
-            prim["image"],
-        )
-        primary_weapon.validate()
-
-        sec = player["secondary_weapon"]
-        secondary_weapon = BulletProperties(
-            sec["damage"],
-            sec["speed"],
-            sec["sound"],
-            sec["reload"],
-            sec["image"],
-        )
-        secondary_weapon.validate()
-
-        player_props = PlayerProperties(
-            player["damage"],
-            player["armor"],
-            player["maneuverability"],
-            player["acceleration"],
-            player["sound_on_impact"],
-            player["image"],
-            player["anim_on_destroy"],
-            primary_weapon,
-            secondary_weapon,
-        )
+        self._all: List[GameObject] = []
+        # handle: (index in the list of its kind, index in all)
+        self._slots: Dict[int, Tuple[int, int]] = {}
+        self._removed: Dict[int, GameObject] = {}
+
+    def _kind(self, obj: GameObject) -> Optional[List[Any]]:
+        if isinstance(obj, Enemy):
+            return self._enemies
+        if isinstance(obj, Bullet):
+            return self._bullets
+        return None
+
+    def add(self, obj: GameObject) -> int:
+        handle = self._next_handle
+        self._next_handle += 1
+        obj.handle = handle
+        kind = self._kind(obj)
+        kind_slot = -1
+        if kind is not None:
+            kind_slot = len(kind)
+            kind.append(obj)
+        self._slots[handle] = (kind_slot, len(self._all))
+        self._all.append(obj)
+        self._objects[handle] = obj
+        return handle
+
+    def get(self, handle: int) -> Optional[GameObject]:
+        return self._objects.get(handle)
+
+    def remove(self, obj: GameObject):
+        """ marks obj for removal, it stays in the views until apply_removals """
+        if obj.handle in self._objects:
+            self._removed[obj.handle] = obj
+
+    def is_removed(self, obj: GameObject) -> bool:
+        return obj.handle in self._removed or obj.handle not in self._objects
+
+    def apply_removals(self, on_removed: Callable[[GameObject], None]):
+        if not self._removed:
+            return
+        for obj in self._removed.values():
+            self._delete(obj)
+            on_removed(obj)
+        self._removed.clear()
+
+    def _delete(self, obj: GameObject):
+        handle = obj.handle
+        kind_slot, all_slot = self._slots.pop(handle)
+        del self._objects[handle]
+        obj.handle = -1
+
+        kind = self._kind(obj)
+        if kind is not None:
+            last = kind.pop()
+            if last is not obj:
+                kind[kind_slot] = last
+                self._slots[last.handle] = (kind_slot, self._slots[last.handle][1])
+
+        last = self._all.pop()
+        if last is not obj:
+            self._all[all_slot] = last
+            self._slots[last.handle] = (self._slots[last.handle][0], all_slot)
+
+    def __len__(self) -> int:
+        return len(self._all)
 
-        player_props.validate()
+    @property
+    def enemies(self) -> Sequence[Enemy]:
+        return self._enemies
+
+    @property
+    def bullets(self) -> Sequence[Bullet]:
+        return self._bullets
 
-        self._player = Player(
-            player_props, Vector2(window.center), self._bullets.append
+    @property
+    def all(self) -> Sequence[GameObject]:
+        return self._all
+
+
+class Level:
+    def __init__(
+        self,
+        screen: Surface,
+        json_path: str,
+        data: Optional[Dict[str, Any]] = None,
+        compiled: Optional[CompiledLevel] = None,
+    ):
+        """ compiled replaces what json_path holds, e.g. with apply_overrides """
+        self._entities = EntityRegistry()
+        self._enemies_destroyed = 0
+        self._kinematics: Optional[KinematicsStore] = create_store()
+        level = compiled or compiled_level(json_path, data)
+        primary_weapon = level.player.primary_weapon
+
+        pool_size = _bullets_in_flight(screen, primary_weapon) + _bullets_in_flight(
+            screen, level.player.secondary_weapon
         )
-        self._enemies: List[Enemy] = []
+        self._bullet_pool: Pool[Bullet] = Pool(
+            lambda: Bullet(primary_weapon, Vector2(), Vector2()), pool_size
+        )
+        # every bullet destroys at most one enemy, which explodes once
+        anim.reserve(pool_size)
 
-        for a in data["enemies"]:
-            enemy_props = {}
-            c = len(a["tiers"])
-            for t in a["tiers"]:
-                p = EnemyProperties(
-                    t["damage"],
-                    t["armor"],
-                    t["max_velocity"],
-                    t["min_velocity"],
-                    t["max_rotation"],
-                    t["scale"],
-                    t["children"],
-                    t["sound_on_destroy"],
-                    t["sound_on_impact"],
-                    t["image"],
-                    t["anim_on_destroy"],
-                )
-                p.validate()
-                enemy_props[c] = p
-                c = c - 1
+        self._player = Player(level.player, Vector2(window.center), self._add_bullet)
+        self._entities.add(self._player)
+        self._enemy_grid: SpatialGrid[Enemy] = SpatialGrid()
 
+        for enemy_props in level.enemies:
             position = get_safe_enemy_distance(screen, self.player.geometry.position)
 
-            self._enemies.append(
-                Enemy(enemy_props, position, self._enemies.append, len(a["tiers"]))
+            self._add_enemy(
+                Enemy(enemy_props, position, self._add_enemy, len(enemy_props))
             )
 
-        self._background: Background = Background(
-            data["background"], data["soundtrack"]
-        )
+        self._background: Background = Background(level.background, level.soundtrack)
 
     @property
     def background(self) -> Background:
@@ -125,7 +386,7 @@ class Level:
 
     @property
     def bullets(self) -> Sequence[Bullet]:
-        return self._bullets
+        return self._entities.bullets
 
     @property
     def player(self) -> Player:
@@ -133,30 +394,82 @@ class Level:
 
     @property
     def enemies(self) -> Sequence[Enemy]:
-        return self._enemies
+        return self._entities.enemies
+
+    @property
+    def kinematics(self) -> Optional[KinematicsStore]:
+        return self._kinematics
+
+    @property
+    def enemy_grid(self) -> SpatialGrid[Enemy]:
+        return self._enemy_grid
 
     @property
     def game_objects(self) -> Sequence[GameObject]:
-        game_objects = [*self._enemies, *self._bullets]
-        if self._player:
-            game_objects.append(self._player)
-        return game_objects
+        return self._entities.all
+
+    @property
+    def entities(self) -> EntityRegistry:
+        return self._entities
+
+    @property
+    def bullet_pool(self) -> Pool[Bullet]:
+        return self._bullet_pool
+
+    @property
+    def enemies_destroyed(self) -> int:
+        return self._enemies_destroyed
+
+    def _add_bullet(
+        self, props: BulletProperties, position: Vector2, velocity: Vector2
+    ):
+        bullet = self._bullet_pool.acquire()
+        bullet.reset(props, position, velocity)
+        self._entities.add(bullet)
+        if self._kinematics:
+            self._kinematics.attach(bullet)
 
     def remove_bullet(self, bullet: Bullet):
-        self._bullets.remove(bullet)
+        self._entities.remove(bullet)
+
+    def _add_enemy(self, a: Enemy):
+        self._entities.add(a)
+        self._enemy_grid.insert(a)
+        if self._kinematics:
+            self._kinematics.attach(a, Enemy.EDGE_OFFSET, Enemy.VELOCITY_DECREASE)
 
     def remove_enemy(self, a: Enemy):
-        self._enemies.remove(a)
+        # out of the grid right away, so it takes no more hits this tick
+        self._entities.remove(a)
+        self._enemy_grid.remove(a)
+        self._enemies_destroyed += 1
+
+    def apply_removals(self):
+        """ removes the objects marked this tick, called once at its end """
+        self._entities.apply_removals(self._on_removed)
+
+    def _on_removed(self, obj: GameObject):
+        if self._kinematics:
+            self._kinematics.detach(obj)
+        if isinstance(obj, Bullet):
+            self._bullet_pool.release(obj)
 
 
 class World:
-    def _load_level(self, screen: Surface, directory: str) -> Callable[[], Level]:
-        return lambda: Level(
-            screen, os.path.join(constants.LEVELS_ROOT, directory, ".json")
+    def _load_level(
+        self, screen: Surface, directory: str
+    ) -> Callable[[Optional[Dict[str, Any]]], Level]:
+        return lambda data: Level(
+            screen,
+            os.path.join(constants.LEVELS_ROOT, directory, ".json"),
+            data,
+            self._overrides.get(directory),
         )
 
     def __init__(self, screen: Surface):
-        self._levels: Dict[int, Tuple[str, Callable[[], Level]]] = {}
+        self._levels: Dict[
+            int, Tuple[str, Callable[[Optional[Dict[str, Any]]], Level]]
+        ] = {}
         for d in os.listdir(constants.LEVELS_ROOT):
             if not d.startswith(".") and os.path.isdir(
                 os.path.join(constants.LEVELS_ROOT, d)
@@ -164,19 +477,72 @@ class World:
                 (k, _) = d.split("_")
                 self._levels[int(k)] = (d, self._load_level(screen, d))
 
+        self._overrides: Dict[str, CompiledLevel] = {}
         self._current_level_id = -1
+        self._prefetcher = ThreadPoolExecutor(max_workers=1)
+        self._prefetched: Dict[str, "Future[LevelAssets]"] = {}
+
+    def prefetch_next_level(self):
+        """ decodes the assets of the level advance_level picks in the background """
+        level_id = self._next_level_id()
+        if level_id not in self._levels:
+            return
+        level_name = self._levels[level_id][0]
+        if level_name not in self._prefetched:
+            self._prefetched[level_name] = self._prefetcher.submit(
+                load_assets, level_name
+            )
+
+    def take_prefetched(self, level_name: str) -> Optional[LevelAssets]:
+        """ waits for and hands out prefetched assets, None if never prefetched """
+        future = self._prefetched.pop(level_name, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as err:
+            logger.warning(f"prefetching {level_name} failed: {err}")
+            return None
+
+    def discard_prefetched(self):
+        self._prefetched = {}
 
     def start_current_level(self):
         if self._current_level_id == -1:
             self._current_level_id = 0
-        self._levels[self._current_level_id][1]()
+        self._levels[self._current_level_id][1](None)
 
     def start_next_level(self):
         self.advance_level()
-        self._levels[self._current_level_id][1]()
-
-    def start_level(self, level_id: int) -> Level:
-        return self._levels[level_id][1]()
+        self._levels[self._current_level_id][1](None)
+
+    def start_level(
+        self, level_id: int, data: Optional[Dict[str, Any]] = None
+    ) -> Level:
+        return self._levels[level_id][1](data)
+
+    def override_level(self, level_id: int, overrides: Sequence[Tuple[str, Any]]):
+        """
+        starts level_id from its json with overrides applied, see apply_overrides,
+        no overrides go back to the file as it is
+        """
+        if not overrides:
+            self.replace_level(level_id, None)
+            return
+        directory = self._levels[level_id][0]
+        data = read_level_json(os.path.join(constants.LEVELS_ROOT, directory, ".json"))
+        self.replace_level(level_id, apply_overrides(data, overrides))
+
+    def replace_level(self, level_id: int, data: Optional[Dict[str, Any]]):
+        """
+        starts level_id from validated json data instead of its file, with the
+        assets of level_id, None goes back to the file
+        """
+        directory = self._levels[level_id][0]
+        if data is None:
+            self._overrides.pop(directory, None)
+        else:
+            self._overrides[directory] = compile_level(data)
 
     def get_current_level(self) -> Tuple[int, str]:
         if self._current_level_id == -1:
@@ -186,13 +552,16 @@ class World:
     def set_current_level(self, level_id: int):
         self._current_level_id = level_id
 
-    def advance_level(self):
+    def _next_level_id(self) -> int:
         if self._current_level_id >= len(self._levels) - 1:
-            self._current_level_id = 0
+            return 0
         elif self._current_level_id == -1:
-            self._current_level_id = 0
+            return 0
         else:
-            self._current_level_id += 1
+            return self._current_level_id + 1
+
+    def advance_level(self):
+        self._current_level_id = self._next_level_id()
 
     def set_previous_level(self):
         if self._current_level_id > 0:
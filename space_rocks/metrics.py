@@ -0,0 +1,146 @@
+"""
+Timing samples per section in fixed size ring buffers. Sections are the
+functions decorated with @timer, plus FRAME for the time of whole frames.
+"""
+import atexit
+import csv
+import json
+import logging
+import math
+from array import array
+from typing import Dict, List, NamedTuple, Tuple
+
+from space_rocks import constants
+
+logger = logging.getLogger(__name__)
+
+FRAME = "frame"
+# upper bounds of the frame time histogram buckets in ms, the last one is open
+FRAME_BUCKETS = (4.0, 8.0, 12.0, 16.7, 20.0, 25.0, 33.3, 50.0, 100.0, math.inf)
+
+
+class Summary(NamedTuple):
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class RingBuffer:
+    """ the last capacity samples, recording allocates nothing """
+
+    def __init__(self, capacity: int):
+        assert capacity > 0
+        self._samples = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, value: float):
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        if self._count < len(self._samples):
+            self._count += 1
+
+    def values(self) -> List[float]:
+        """ the samples, oldest first """
+        if self._count < len(self._samples):
+            return self._samples[: self._count].tolist()
+        newest = self._samples[: self._next].tolist()
+        return self._samples[self._next :].tolist() + newest
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    """ nearest rank percentile of sorted samples """
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def summarize(samples: List[float]) -> Summary:
+    if not samples:
+        return Summary(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    ordered = sorted(samples)
+    return Summary(
+        len(ordered),
+        sum(ordered) / len(ordered),
+        _percentile(ordered, 50),
+        _percentile(ordered, 95),
+        _percentile(ordered, 99),
+        ordered[-1],
+    )
+
+
+_buffers: Dict[str, RingBuffer] = {}
+
+
+def register(name: str):
+    if name not in _buffers:
+        _buffers[name] = RingBuffer(constants.METRICS_SAMPLES)
+
+
+def record(name: str, ms: float):
+    buffer = _buffers.get(name)
+    if buffer is None:
+        register(name)
+        buffer = _buffers[name]
+    buffer.add(ms)
+
+
+def record_frame(ms: float):
+    record(FRAME, ms)
+
+
+def sections() -> List[str]:
+    return list(_buffers)
+
+
+def summary(name: str) -> Summary:
+    buffer = _buffers.get(name)
+    return summarize(buffer.values() if buffer else [])
+
+
+def histogram(name: str = FRAME) -> List[Tuple[float, int]]:
+    """ (upper bound in ms, samples) per bucket of FRAME_BUCKETS """
+    counts = [0] * len(FRAME_BUCKETS)
+    buffer = _buffers.get(name)
+    for value in buffer.values() if buffer else []:
+        for i, bound in enumerate(FRAME_BUCKETS):
+            if value <= bound:
+                counts[i] += 1
+                break
+    return list(zip(FRAME_BUCKETS, counts))
+
+
+def report() -> Dict[str, Dict]:
+    return {
+        name: {
+            "summary": summary(name)._asdict(),
+            "histogram": [
+                {"le_ms": bound if bound != math.inf else None, "count": count}
+                for bound, count in histogram(name)
+            ],
+        }
+        for name in _buffers
+    }
+
+
+def export(path: str):
+    """ writes every section as json, or as csv when path ends with .csv """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["section", *Summary._fields])
+            for name in _buffers:
+                writer.writerow([name, *summary(name)])
+    else:
+        with open(path, "w") as f:
+            json.dump(report(), f, indent=2)
+    logger.info(f"metrics exported to {path}")
+
+
+def export_at_exit(path: str):
+    atexit.register(export, path)
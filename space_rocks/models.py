@@ -1,8 +1,9 @@
 from enum import Enum
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 from typing import NamedTuple
 
 import pygame
+from pygame.mask import Mask
 from pygame.math import Vector2
 from pygame.surface import Surface
 
@@ -14,10 +15,11 @@ from space_rocks.utils import (
     bounce_other,
     bounce_edge,
     get_blit_position,
-    scale_and_rotate,
     get_resize_factor,
     get_random_velocity,
     get_random_rotation,
+    get_random_choice,
+    step_seconds,
 )
 from space_rocks.window import window
 
@@ -34,24 +36,118 @@ class GameObject(pygame.sprite.Sprite):
     def __init__(self, position: Vector2, image: Surface, velocity: Vector2):
         super(GameObject, self).__init__()
         self.image :Surface= image
+        self._store: Optional[Any] = None
+        self.row = -1
+        self.handle = -1  # in the entity registry of the level
         self.geometry = Geometry(position, image.get_width() / 2, velocity)
         self.rect = self.image.get_rect(center=position)
+        self._previous_position = Vector2(position)
+        self._render_position = Vector2(position)
+
+    @property
+    def geometry(self) -> Geometry:
+        """ while stored, a view that reads and writes the row of the store """
+        return self._geometry
+
+    @geometry.setter
+    def geometry(self, geometry: Geometry):
+        if self._store is None:
+            self._geometry = geometry
+        elif geometry is not self._geometry:
+            self._store.set_geometry(self.row, geometry)
+
+    @property
+    def is_stored(self) -> bool:
+        return self._store is not None
+
+    def attach(self, store: Any, row: int, geometry: Geometry):
+        self._store = store
+        self.row = row
+        self._geometry = geometry
+
+    def detach(self, geometry: Geometry):
+        self._store = None
+        self.row = -1
+        self._geometry = geometry
+
+    @property
+    def render_position(self) -> Vector2:
+        return self._render_position
+
+    def remember_position(self):
+        position = self.geometry.position
+        self._previous_position.x = position.x
+        self._previous_position.y = position.y
+
+    def interpolate(self, alpha: float):
+        """ render position between the previous and the current simulation step """
+        previous = self._previous_position
+        current = self.geometry.position
+        self._render_position.x = previous.x + (current.x - previous.x) * alpha
+        self._render_position.y = previous.y + (current.y - previous.y) * alpha
 
     def move(self, surface: Surface):
         pass
 
-    def draw(self, surface: Surface):
+    def frame_image(self) -> Optional[Surface]:
+        """ the image to draw this frame, None when there is nothing to draw """
+        return None
+
+    def shape(self) -> Surface:
+        """ the image as it shows right now, without advancing any animation """
+        return self.image
+
+    def warm_rotations(self):
+        """ caches every rotation step shape can show, rotations are made on use """
         pass
 
+    @property
+    def mask(self) -> Mask:
+        """ collision mask of shape, cached with the surface """
+        return gfx.get_mask(self.shape())
+
+    def _fit_rect(self, image: Surface):
+        """ keeps rect around image, rotated sprites grow and shrink """
+        position = self.geometry.position
+        self.rect.size = image.get_size()
+        self.rect.center = (int(position.x), int(position.y))
+
+    def draw(self, surface: Surface):
+        image = self.frame_image()
+        if image is None:
+            return
+        surface.blit(image, get_blit_position(image, self.render_position))
+
     def resize(self):
         pass
 
+    def reload_image(self):
+        """ picks up a sprite that changed on disk """
+        pass
+
+    def _reset(self, position: Vector2, image: Surface, velocity: Vector2):
+        """ reuses the object in place, as if it was created with these arguments """
+        assert not self.is_stored
+        self.image = image
+        radius = image.get_width() / 2
+        geometry = self._geometry
+        if geometry.radius == radius:
+            geometry.set_pos(position.x, position.y)
+            geometry.set_vel(velocity.x, velocity.y)
+        else:
+            self._geometry = Geometry(position, radius, velocity)
+        self.rect.size = image.get_size()
+        self.rect.center = (int(position.x), int(position.y))
+        self._previous_position.update(position)
+        self._render_position.update(position)
+
     def reposition(self):
-        new_pos = Vector2(
-            window.factor.x * self.geometry.position.x,
-            window.factor.y * self.geometry.position.y,
+        geometry = self.geometry
+        geometry.set_pos(
+            window.factor.x * geometry.position.x,
+            window.factor.y * geometry.position.y,
         )
-        self.geometry = self.geometry.update_pos(new_pos)
+        self.geometry = geometry
 
 
 class BulletProperties(NamedTuple):
@@ -75,25 +171,34 @@ class Bullet(GameObject):  # rename class to weapon
             velocity,
         )
         self._p = props
-        sounds.play(self._p.sound)
+
+    def reset(self, props: BulletProperties, position: Vector2, velocity: Vector2):
+        self._p = props
+        self._reset(
+            position,
+            gfx.get(props.image, resize=get_resize_factor(0.05)),
+            velocity,
+        )
 
     @property
     def damage(self):
         return self._p.damage
 
     def move(self, surface: Surface):
-        self.geometry = self.geometry.update_pos(
-            self.geometry.position + self.geometry.velocity
-        )
+        if self.is_stored:
+            return
+        self.geometry.advance(step_seconds())
 
-    def draw(self, surface: Surface):
-        blit_position = get_blit_position(self.image, self.geometry.position)
-        surface.blit(self.image, blit_position)
+    def frame_image(self) -> Optional[Surface]:
+        return self.image
 
     def resize(self):
         self.image = gfx.get(self._p.image, resize=get_resize_factor(0.03))
         self.reposition()
 
+    def reload_image(self):
+        self.image = gfx.get(self._p.image, resize=get_resize_factor(0.05))
+
 
 class EnemyProperties(NamedTuple):
     damage: float
@@ -117,6 +222,9 @@ class EnemyProperties(NamedTuple):
 
 
 class Enemy(GameObject):
+    EDGE_OFFSET = 20
+    VELOCITY_DECREASE = 1
+
     def __init__(
         self,
         properties: Dict[int, EnemyProperties],
@@ -132,40 +240,53 @@ class Enemy(GameObject):
         self._scale = self._p.scale
         self._armor = self._p.armor
         self._rotation = get_random_rotation(0, self._p.max_rotation)
-        image = scale_and_rotate(
-            gfx.get(self._p.image, resize=get_resize_factor(0.1)),
-            0,
-            self._scale,
-        )
+        self._image_name = get_random_choice(self._p.image)
 
         super().__init__(
             position,
-            image,
+            self._tier_image(),
             get_random_velocity(self._p.min_velocity, self._p.max_velocity),
         )
 
     def resize(self):
-        self.image = gfx.get(self._p.image, resize=get_resize_factor(0.1))
+        self.image = gfx.get(self._image_name, resize=get_resize_factor(0.1))
         self._scale *= max(window.factor.x, window.factor.y)
 
         self.reposition()
 
-    def draw(self, surface: Surface):
+    def reload_image(self):
+        self.image = self._tier_image()
+
+    def _tier_image(self) -> Surface:
+        """ one surface, and so one mask, per sprite and scale for all enemies """
+        return gfx.get(
+            self._image_name, resize=get_resize_factor(0.1), scale=self._scale
+        )
+
+    def shape(self) -> Surface:
+        if self._rotation <= 0:
+            return self.image
+        return gfx.get_rotated(self._image_name, self.image, self._angle)
+
+    def warm_rotations(self):
         if self._rotation > 0:
-            self._angle += self._rotation
-            rotated_surface = scale_and_rotate(self.image, self._angle, 1)
-        else:
-            rotated_surface = self.image
+            gfx.warm_rotations(self._image_name, self.image)
 
-        blit_position = get_blit_position(rotated_surface, self.geometry.position)
-        surface.blit(rotated_surface, blit_position)
+    def frame_image(self) -> Optional[Surface]:
+        return self.shape()
 
     def move(self, surface: Surface):
-        self.geometry = bounce_edge(surface, 20, 1, self.geometry)
-        self.rect.center = (
-            int(self.geometry.position.x),
-            int(self.geometry.position.y),
-        )
+        if not self.is_stored:
+            self.geometry = bounce_edge(
+                surface, self.EDGE_OFFSET, self.VELOCITY_DECREASE, self.geometry
+            )
+        if self._rotation > 0:
+            # turning with the simulation keeps collisions independent of rendering
+            self._angle += self._rotation * step_seconds()
+            self._fit_rect(self.shape())
+        else:
+            position = self.geometry.position
+            self.rect.center = (int(position.x), int(position.y))
 
     def split(self):
         sounds.play(self._p.sound_on_destroy)
@@ -185,7 +306,6 @@ class Enemy(GameObject):
             sounds.play(self._p.sound_on_impact)
             self.geometry = bounce_other(self.geometry, other)
         else:
-            sounds.play(self._p.sound_on_destroy)
             self.split()
 
     def get_impact_animation(self):
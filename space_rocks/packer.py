@@ -0,0 +1,141 @@
+"""
+Builds level asset packs, see space_rocks.packs for the format.
+
+    $ python -m space_rocks.packer [level_dir ...]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame.mixer import Sound
+from pygame.surface import Surface
+
+import space_rocks.animation as anim
+import space_rocks.audio as sounds
+import space_rocks.graphics as gfx
+from space_rocks import constants
+from space_rocks.levels import read_level_json
+from space_rocks.packs import (
+    HEADER,
+    MAGIC,
+    PIXEL_FORMAT,
+    fingerprint,
+    mixer_format,
+    pack_path,
+    source_files,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Blobs:
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._length = 0
+        self._hash = hashlib.sha256()
+
+    def add(self, data: bytes) -> Dict[str, Any]:
+        entry = {
+            "offset": self._length,
+            "length": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        self._chunks.append(data)
+        self._length += len(data)
+        self._hash.update(data)
+        return entry
+
+    def add_surface(self, surface: Surface) -> Dict[str, Any]:
+        entry = self.add(pygame.image.tostring(surface, PIXEL_FORMAT))
+        entry["size"] = list(surface.get_size())
+        return entry
+
+    @property
+    def chunks(self) -> List[bytes]:
+        return self._chunks
+
+    @property
+    def hash(self) -> str:
+        return self._hash.hexdigest()
+
+
+def build(level_name: str) -> str:
+    json_path = os.path.join(constants.LEVELS_ROOT, level_name, ".json")
+    level_data = read_level_json(json_path)
+    sources = fingerprint(source_files(level_name))
+
+    blobs = _Blobs()
+    sprites = {k: blobs.add_surface(s) for k, s in gfx.load(level_name).items()}
+    # soundtracks are streamed from their files
+    soundtracks = {n.strip(" ") for n in level_data["soundtrack"].lower().split(",")}
+    level_sounds = {
+        k: blobs.add(Sound(path).get_raw())
+        for k, path in sounds.load(level_name).files.items()
+        if k not in soundtracks
+    }
+    animations = anim.load(level_name)
+    manifest = {
+        "level": level_data,
+        "sources": sources,
+        "mixer": mixer_format(),
+        "sprites": sprites,
+        "sounds": level_sounds,
+        "animations": {
+            k: {"speed": a.speed, "frames": [blobs.add_surface(f) for f in a.frames]}
+            for k, a in animations.animations.items()
+        },
+        "resized_animations": [
+            {
+                "name": name,
+                "size": list(size),
+                "speed": a.speed,
+                "frames": [blobs.add_surface(f) for f in a.frames],
+            }
+            for (name, size), a in animations.resized.items()
+        ],
+        "hash": blobs.hash,
+    }
+
+    path = pack_path(level_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    encoded = json.dumps(manifest).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(encoded)))
+        f.write(encoded)
+        for chunk in blobs.chunks:
+            f.write(chunk)
+    logger.info(f"{path} built, {os.path.getsize(path) / 1024 ** 2:.1f} Mb")
+    return path
+
+
+def _level_dirs() -> List[str]:
+    return sorted(
+        d
+        for d in os.listdir(constants.LEVELS_ROOT)
+        if not d.startswith(".")
+        and os.path.isfile(os.path.join(constants.LEVELS_ROOT, d, ".json"))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="builds level asset packs")
+    parser.add_argument("levels", nargs="*", help="level folders, all by default")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sounds.init_audio()
+    pygame.display.set_mode((1, 1))
+    for level_name in args.levels or _level_dirs():
+        build(level_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Level asset packs: one file per level holding decoded sprites, sliced animation
+frames, sound effect PCM and the validated level json. Packs are built with
+`python -m space_rocks.packer` and memory mapped at runtime.
+
+Layout: MAGIC, the manifest length as little endian u64, the json manifest and
+then the raw data every manifest entry points into with offset and length.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import pygame
+from pygame.surface import Surface
+
+from space_rocks import constants
+from space_rocks.animation import AnimationBank, AnimationData
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SRPACK01"
+HEADER = struct.Struct("<Q")
+PIXEL_FORMAT = "RGBA"
+
+
+class Pack(NamedTuple):
+    sounds: Optional[Dict[str, memoryview]]  # None when the mixer format differs
+    sprites: Dict[str, Surface]
+    animations: AnimationBank
+    level_data: Dict[str, Any]
+
+
+def pack_path(level_name: str) -> str:
+    return os.path.join(constants.PACKS_ROOT, f"{level_name.lower()}.pack")
+
+
+def source_files(level_name: str) -> List[str]:
+    """ every file the directory loaders would read for this level """
+    paths = [f"{constants.LEVELS_ROOT}level_schema.json"]
+    for root_dir in (
+        f"{constants.LEVELS_ROOT}{level_name.lower()}/",
+        constants.GFX_ASSETS_ROOT,
+        constants.SOUND_ASSETS_ROOT,
+        constants.ANIM_ASSETS_ROOT,
+    ):
+        for root, _, files in os.walk(root_dir):
+            paths.extend(os.path.join(root, f) for f in files)
+    return sorted(paths)
+
+
+def fingerprint(paths: List[str]) -> Dict[str, Tuple[int, int]]:
+    fingerprints: Dict[str, Tuple[int, int]] = {}
+    for p in paths:
+        stat = os.stat(p)
+        fingerprints[p] = (stat.st_mtime_ns, stat.st_size)
+    return fingerprints
+
+
+def mixer_format() -> Optional[List[int]]:
+    info = pygame.mixer.get_init()
+    return list(info) if info else None
+
+
+def _map(path: str) -> Tuple[mmap.mmap, Dict[str, Any], memoryview]:
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if mapping[: len(MAGIC)] != MAGIC:
+        mapping.close()
+        raise ValueError(f"{path} is not a level pack")
+    start = len(MAGIC) + HEADER.size
+    (manifest_length,) = HEADER.unpack_from(mapping, len(MAGIC))
+    manifest = json.loads(mapping[start : start + manifest_length])
+    data = memoryview(mapping)[start + manifest_length :]
+    return mapping, manifest, data
+
+
+def read_manifest(level_name: str) -> Optional[Dict[str, Any]]:
+    path = pack_path(level_name)
+    if not os.path.isfile(path):
+        return None
+    mapping, manifest, data = _map(path)
+    data.release()
+    mapping.close()
+    return manifest
+
+
+def read(level_name: str) -> Optional[Pack]:
+    """ the mapped pack of a level, None when there is none or it is stale """
+    path = pack_path(level_name)
+    if not os.path.isfile(path):
+        return None
+    try:
+        mapping, manifest, data = _map(path)
+    except ValueError as err:
+        logger.warning(err)
+        return None
+
+    current = {p: list(v) for p, v in fingerprint(source_files(level_name)).items()}
+    if manifest["sources"] != current:
+        logger.info(f"{path} is stale, loading {level_name} from its directory")
+        data.release()
+        mapping.close()
+        return None
+
+    def surface(entry: Dict[str, Any]) -> Surface:
+        offset, length = entry["offset"], entry["length"]
+        return pygame.image.frombuffer(
+            data[offset : offset + length], tuple(entry["size"]), PIXEL_FORMAT
+        )
+
+    def frames(entries: List[Dict[str, Any]]) -> List[Surface]:
+        # frames are blitted as they are, so they get the display format right away
+        return [surface(e).convert_alpha() for e in entries]
+
+    sprites = {k: surface(e) for k, e in manifest["sprites"].items()}
+    animations = AnimationBank(
+        {
+            k: AnimationData(frames(e["frames"]), e["speed"])
+            for k, e in manifest["animations"].items()
+        },
+        {
+            (e["name"], (e["size"][0], e["size"][1])): AnimationData(
+                frames(e["frames"]), e["speed"]
+            )
+            for e in manifest["resized_animations"]
+        },
+    )
+
+    level_sounds: Optional[Dict[str, memoryview]] = None
+    if manifest["mixer"] == mixer_format():
+        # sounds are made from these views the first time they play
+        level_sounds = {
+            k: data[e["offset"] : e["offset"] + e["length"]]
+            for k, e in manifest["sounds"].items()
+        }
+    else:
+        logger.info(f"{path} was built for another mixer format, skipping sounds")
+
+    # surfaces and views hold on to the mapping, it is unmapped with the last of them
+    logger.info(f"{path} mapped, {manifest['hash'][:12]}")
+    return Pack(level_sounds, sprites, animations, manifest["level"])
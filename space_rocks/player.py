@@ -1,7 +1,6 @@
 from enum import Enum
-from typing import NamedTuple, Callable, Any
+from typing import NamedTuple, Callable, Optional
 
-import pygame
 from pygame import Vector2
 from pygame.surface import Surface
 
@@ -9,13 +8,14 @@ import space_rocks.animation as anim
 import space_rocks.audio as sounds
 import space_rocks.graphics as gfx
 from space_rocks.geometry import Geometry
-from space_rocks.models import Bullet, BulletProperties, GameObject
+from space_rocks.models import BulletProperties, GameObject
 from space_rocks.utils import (
     bounce_other,
-    get_blit_position,
-    scale_and_rotate,
     bounce_edge,
     get_resize_factor,
+    get_random_choice,
+    get_ticks,
+    step_seconds,
 )
 from space_rocks.window import window
 
@@ -50,23 +50,25 @@ class Player(GameObject):
         self,
         properties: PlayerProperties,
         position: Vector2,
-        create_bullet_callback: Callable[[Any], None],
+        create_bullet_callback: Callable[[BulletProperties, Vector2, Vector2], None],
     ):
         self._p = properties
         self._create_bullet_callback = create_bullet_callback
-        self._direction = self.UP
+        self._direction = Vector2(self.UP)
         self._active_weapon = ActiveWeapon.PRIMARY
         self._last_shot = 0
         self._armor = self._p.armor
-        self._angle = 0.0
+        self._image_name = get_random_choice(self._p.image_name)
 
         super().__init__(
             position,
-            gfx.get(self._p.image_name, resize=get_resize_factor(0.1)),
+            gfx.get(self._image_name, resize=get_resize_factor(0.1)),
             Vector2(0),
         )
 
-        self._rotated_image = self.image
+    @property
+    def properties(self) -> PlayerProperties:
+        return self._p
 
     @property
     def damage(self):
@@ -80,42 +82,43 @@ class Player(GameObject):
     def direction(self):
         return self._direction
 
+    @property
+    def maneuverability(self) -> float:
+        """ degrees turned per second """
+        return self._p.maneuverability
+
     def resize(self):
-        self.image = gfx.get(self._p.image_name, resize=get_resize_factor(0.1))
+        self.image = gfx.get(self._image_name, resize=get_resize_factor(0.1))
         self.reposition()
 
+    def reload_image(self):
+        self.image = gfx.get(self._image_name, resize=get_resize_factor(0.1))
+
     def rotate(self, clockwise: bool = True):
         sign = 1 if clockwise else -1
-        angle = self._p.maneuverability * sign
-        self._direction = self._direction.rotate(angle)
+        angle = self._p.maneuverability * sign * step_seconds()
+        self._direction.rotate_ip(angle)
+        self._fit_rect(self.shape())
 
     def move(self, surface: Surface):
-        self.geometry = bounce_edge(surface, 50, 0.6, self.geometry)
-        self.rect.center = (
-            int(self.geometry.position.x),
-            int(self.geometry.position.y),
-        )
-
-    def draw(self, surface: Surface):
-        if self.armor <= 0:
-            return
+        bounce_edge(surface, 50, 0.6, self.geometry)
+        position = self.geometry.position
+        self.rect.center = (int(position.x), int(position.y))
 
+    def shape(self) -> Surface:
         angle = self._direction.angle_to(self.UP)
-        if angle != self._angle:
-            rotated_surface = scale_and_rotate(self.image, angle, 1)
-            self._rotated_image = rotated_surface
-            self._angle = angle
-        else:
-            rotated_surface = self._rotated_image
+        return gfx.get_rotated(self._image_name, self.image, angle)
 
-        blit_position = get_blit_position(rotated_surface, self.geometry.position)
+    def warm_rotations(self):
+        gfx.warm_rotations(self._image_name, self.image)
 
-        surface.blit(rotated_surface, blit_position)
+    def frame_image(self) -> Optional[Surface]:
+        if self.armor <= 0:
+            return None
+        return self.shape()
 
     def accelerate(self):
-        self.geometry = self.geometry.update_vel(
-            self.geometry.velocity + (self._direction * self._p.acceleration)
-        )
+        self.geometry.accelerate(self._direction, self._p.acceleration * step_seconds())
 
     def switch_weapon(self):
         if self._active_weapon == ActiveWeapon.PRIMARY:
@@ -131,22 +134,22 @@ class Player(GameObject):
             else self._p.secondary_weapon
         )
 
-        if pygame.time.get_ticks() - self._last_shot < w.reload:
+        if get_ticks() - self._last_shot < w.reload:
             return
 
-        self._last_shot = pygame.time.get_ticks()
+        self._last_shot = get_ticks()
         weapon_velocity = self._direction * w.speed
         weapon_velocity = Vector2(
             weapon_velocity.x * window.factor.x, weapon_velocity.y * window.factor.y
         )
-        w = Bullet(w, self.geometry.position, weapon_velocity)
-        self._create_bullet_callback(w)
+        sounds.play(w.sound)
+        self._create_bullet_callback(w, self.geometry.position, weapon_velocity)
 
     def hit(self, other: Geometry, damage: float):
         self._armor -= damage
         if self._armor > 0:
             sounds.play(self._p.sound_on_impact)
-            self.geometry = bounce_other(self.geometry, other)
+            bounce_other(self.geometry, other)
         else:
             sounds.play(self._p.sound_on_impact)
 
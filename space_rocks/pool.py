@@ -0,0 +1,53 @@
+from typing import Callable, Generic, List, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolStats(NamedTuple):
+    size: int  # objects owned by the pool, in use or free
+    in_use: int
+    high_water: int  # most objects in use at once
+    misses: int  # acquires that found the pool empty and created an object
+
+
+class Pool(Generic[T]):
+    """
+    Free list of reusable objects, acquire and release are O(1).
+    Acquired objects come back as they were released, callers reset them.
+    """
+
+    def __init__(self, create: Callable[[], T], size: int = 0):
+        self._create = create
+        self._free: List[T] = []
+        self._size = 0
+        self._in_use = 0
+        self._high_water = 0
+        self._misses = 0
+        self.reserve(size)
+
+    def reserve(self, size: int):
+        """ creates objects up front until the pool owns at least size of them """
+        for _ in range(size - self._size):
+            self._free.append(self._create())
+            self._size += 1
+
+    def acquire(self) -> T:
+        if self._free:
+            obj = self._free.pop()
+        else:
+            obj = self._create()
+            self._size += 1
+            self._misses += 1
+        self._in_use += 1
+        if self._in_use > self._high_water:
+            self._high_water = self._in_use
+        return obj
+
+    def release(self, obj: T):
+        assert self._in_use > 0, "released more objects than were acquired"
+        self._in_use -= 1
+        self._free.append(obj)
+
+    @property
+    def stats(self) -> PoolStats:
+        return PoolStats(self._size, self._in_use, self._high_water, self._misses)
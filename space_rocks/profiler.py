@@ -0,0 +1,197 @@
+"""
+Profiling mode: nested spans around the phases of a frame, written as a Chrome
+trace (chrome://tracing, ui.perfetto.dev) and as collapsed stacks for
+flamegraph.pl or speedscope. Optionally a thread samples the call stack of the
+main thread every PROFILE_SAMPLE_MS, those stacks go to a second collapsed file.
+The sampler needs the GIL, so intervals below sys.getswitchinterval() take
+fewer samples than asked for.
+
+Spans are only recorded on the thread that started profiling, span is a shared
+no-op context manager while profiling is off.
+"""
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from types import FrameType
+from typing import ContextManager, List, Optional, Tuple
+
+from space_rocks import constants
+
+logger = logging.getLogger(__name__)
+
+_NULL_SPAN = nullcontext()
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval_ms: float):
+        super(_Sampler, self).__init__(name="profiler-sampler", daemon=True)
+        self._thread_id = thread_id
+        self._interval = interval_ms / 1000
+        self._stopped = threading.Event()
+        self.stacks: "Counter[str]" = Counter()
+
+    @staticmethod
+    def _collapse(frame: Optional[FrameType]) -> str:
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class _Profile:
+    def __init__(self, sample_ms: float, max_events: int):
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        # (name, start, end) in perf_counter seconds, nesting follows from the times
+        self.events: List[Tuple[str, float, float]] = []
+        self.max_events = max_events
+        self.dropped = 0
+        # [name, time spent in children] per open span, outermost first
+        self.stack: List[List] = []
+        self.folded: "Counter[str]" = Counter()  # self time in us per stack
+        self.sampler: Optional[_Sampler] = None
+        if sample_ms > 0:
+            self.sampler = _Sampler(self.thread_id, sample_ms)
+            self.sampler.start()
+
+
+class _Span:
+    __slots__ = ("_profile", "_name", "_start")
+
+    def __init__(self, profile: _Profile, name: str):
+        self._profile = profile
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._profile.stack.append([self._name, 0.0])
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        profile = self._profile
+        duration = end - self._start
+        _, children = profile.stack[-1]
+        profile.folded[";".join(s[0] for s in profile.stack)] += (
+            duration - children
+        ) * 1e6
+        profile.stack.pop()
+        if profile.stack:
+            profile.stack[-1][1] += duration
+        if len(profile.events) < profile.max_events:
+            profile.events.append((self._name, self._start, end))
+        else:
+            profile.dropped += 1
+
+
+_profile: Optional[_Profile] = None
+
+
+def span(name: str) -> ContextManager:
+    """ times the with block as name, nested in the spans around it """
+    profile = _profile
+    if profile is None or threading.get_ident() != profile.thread_id:
+        return _NULL_SPAN
+    return _Span(profile, name)
+
+
+def is_active() -> bool:
+    return _profile is not None
+
+
+def start(
+    sample_ms: float = constants.PROFILE_SAMPLE_MS,
+    max_events: int = constants.PROFILE_MAX_EVENTS,
+):
+    """
+    Starts profiling the calling thread, sample_ms 0 takes no stack samples.
+    A profile still running at exit is written to PROFILE_PATH.
+    """
+    global _profile
+    if _profile is not None:
+        return
+    _profile = _Profile(sample_ms, max_events)
+    atexit.register(stop)
+    sampling = f", sampling every {sample_ms} ms" if sample_ms > 0 else ""
+    logger.info(f"profiling started{sampling}")
+
+
+def _trace_events(profile: _Profile) -> List[dict]:
+    pid = os.getpid()
+    thread = {"pid": pid, "tid": 0}
+    events: List[dict] = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "game"}},
+        {"name": "thread_name", "ph": "M", **thread, "args": {"name": "main"}},
+    ]
+    for name, begin, end in profile.events:
+        events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": round((begin - profile.start) * 1e6, 3),
+                "dur": round((end - begin) * 1e6, 3),
+                **thread,
+            }
+        )
+    return events
+
+
+def _write_folded(path: str, stacks: "Counter[str]"):
+    with open(path, "w") as f:
+        for stack, value in sorted(stacks.items()):
+            if round(value) > 0:
+                f.write(f"{stack} {round(value)}\n")
+
+
+def stop(path: str = constants.PROFILE_PATH) -> List[str]:
+    """
+    Stops profiling and writes path.trace.json and path.folded, with span self
+    times in us, plus path.samples.folded with sample counts when sampling.
+    Returns the files written.
+    """
+    global _profile
+    profile = _profile
+    if profile is None:
+        return []
+    _profile = None
+    atexit.unregister(stop)
+    if profile.sampler:
+        profile.sampler.stop()
+    if profile.dropped:
+        logger.warning(f"profile event limit reached, {profile.dropped} spans dropped")
+
+    written = [f"{path}.trace.json", f"{path}.folded"]
+    with open(written[0], "w") as f:
+        json.dump({"traceEvents": _trace_events(profile), "displayTimeUnit": "ms"}, f)
+    _write_folded(written[1], profile.folded)
+    if profile.sampler:
+        written.append(f"{path}.samples.folded")
+        _write_folded(written[2], profile.sampler.stacks)
+    logger.info(f"profile written to {', '.join(written)}")
+    return written
+
+
+def toggle(path: str = constants.PROFILE_PATH) -> List[str]:
+    """ starts profiling, or stops it and returns the files written """
+    if _profile is None:
+        start()
+        return []
+    return stop(path)
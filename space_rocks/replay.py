@@ -0,0 +1,101 @@
+"""
+Replays an input recording as fast as possible, without a window or sound
+device, and prints ticks per second, phase timings and a hash of the final
+game state as json. Record one with `python main.py --record session.rec`.
+
+    $ python -m space_rocks.replay session.rec --no-draw
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+from typing import Any, Dict
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from space_rocks import constants, inputs, metrics
+from space_rocks.game import Game
+from space_rocks.utils import seed_random, use_simulated_ticks
+
+_OBJECT = struct.Struct("<5d")
+
+
+def state_hash(game: Game) -> str:
+    """ sha256 of the game state, level and every entity's geometry and armor """
+    h = hashlib.sha256(f"{game.state.name}:{game.level_id}".encode())
+    level = game.level
+    for o in level.game_objects:
+        g = o.geometry
+        h.update(
+            _OBJECT.pack(
+                g.position.x, g.position.y, g.velocity.x, g.velocity.y, g.radius
+            )
+        )
+    for armored in (level.player, *level.enemies):
+        h.update(struct.pack("<d", armored.armor))
+    return h.hexdigest()
+
+
+def run(path: str, draw: bool = True) -> Dict[str, Any]:
+    recording = inputs.load(path)
+    replay = inputs.ReplayInputs(recording)
+    # seeded before the game is made, as main.py does when recording
+    seed_random(recording.seed)
+    use_simulated_ticks(0)
+    game = Game(headless=True, inputs=replay, screen_size=recording.screen_size)
+    game.set_level(recording.level_id)
+    game.start_the_game()
+    game.wait_for_level()
+
+    # the same step clock as Game.main_loop
+    step_ms = 1000 / constants.SIMULATION_RATE
+    sim_ticks = 0.0
+    timings: Dict[str, float] = {}
+    steps = 0
+    start = time.perf_counter()
+    while not replay.finished:
+        sim_ticks += step_ms
+        use_simulated_ticks(int(sim_ticks))
+        game.tick(draw, timings)
+        steps += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "recording": path,
+        "level": recording.level_id,
+        "seed": recording.seed,
+        "steps": steps,
+        "draw": draw,
+        "elapsed_s": round(elapsed, 4),
+        "ticks_per_second": round(steps / elapsed, 1) if elapsed else 0.0,
+        "phases": {
+            name: {"total_ms": round(total, 3), "mean_ms": round(total / steps, 4)}
+            for name, total in timings.items()
+        },
+        "state": game.state.name,
+        "final_level": game.level_id,
+        "hash": state_hash(game),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--no-draw", dest="draw", action="store_false")
+    parser.add_argument("--metrics", help="exports timing metrics, .json or .csv")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = run(args.recording, args.draw)
+    print(json.dumps(result, indent=2))
+    if args.metrics:
+        metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
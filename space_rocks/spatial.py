@@ -0,0 +1,95 @@
+from typing import Dict, Generic, Iterable, List, Tuple, TypeVar
+
+from space_rocks import constants
+from space_rocks.geometry import Geometry
+from space_rocks.models import GameObject
+
+_CellRange = Tuple[int, int, int, int]
+T = TypeVar("T", bound=GameObject)
+
+
+class SpatialGrid(Generic[T]):
+    """
+    Uniform grid broad-phase, objects are bucketed in every cell their bounding
+    circle overlaps
+    """
+
+    def __init__(self, cell_size: int = constants.COLLISION_CELL_SIZE):
+        assert cell_size > 0
+        self._cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Dict[int, T]] = {}
+        self._ranges: Dict[int, _CellRange] = {}
+
+    def _cell_range(self, geometry: Geometry) -> _CellRange:
+        s = self._cell_size
+        x, y = geometry.position.x, geometry.position.y
+        r = geometry.radius
+        return (
+            int((x - r) // s),
+            int((y - r) // s),
+            int((x + r) // s),
+            int((y + r) // s),
+        )
+
+    def _link(self, obj: T, cell_range: _CellRange):
+        x0, y0, x1, y1 = cell_range
+        key = id(obj)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    cell = self._cells[(cx, cy)] = {}
+                cell[key] = obj
+
+    def _unlink(self, obj: T, cell_range: _CellRange):
+        x0, y0, x1, y1 = cell_range
+        key = id(obj)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells[(cx, cy)]
+                del cell[key]
+                if not cell:
+                    del self._cells[(cx, cy)]
+
+    def insert(self, obj: T):
+        cell_range = self._cell_range(obj.geometry)
+        self._ranges[id(obj)] = cell_range
+        self._link(obj, cell_range)
+
+    def remove(self, obj: T):
+        cell_range = self._ranges.pop(id(obj), None)
+        if cell_range is not None:
+            self._unlink(obj, cell_range)
+
+    def update(self, obj: T):
+        """ re-bucket obj, only touching the cells when it crossed a cell border """
+        old_range = self._ranges.get(id(obj))
+        new_range = self._cell_range(obj.geometry)
+        if old_range == new_range:
+            return
+        if old_range is not None:
+            self._unlink(obj, old_range)
+        self._ranges[id(obj)] = new_range
+        self._link(obj, new_range)
+
+    def update_all(self, objects: Iterable[T]):
+        for o in objects:
+            self.update(o)
+
+    def query(self, geometry: Geometry) -> List[T]:
+        """ candidates that may overlap geometry, in a deterministic order """
+        x0, y0, x1, y1 = self._cell_range(geometry)
+        found: Dict[int, T] = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return list(found.values())
+
+    def clear(self):
+        self._cells = {}
+        self._ranges = {}
+
+    def __len__(self) -> int:
+        return len(self._ranges)
@@ -1,5 +1,6 @@
 from pygame.color import Color
 from pygame.font import Font
+from pygame.rect import Rect
 from pygame.surface import Surface
 
 import space_rocks.audio as sounds
@@ -15,15 +16,17 @@ class UI:
 
     def _print_text(
         self, surface: Surface, text: str, font: Font, color: Color = Color(0, 255, 0)
-    ):
+    ) -> Rect:
         text_surface = font.render(text, True, color)
         if not text_surface:
             raise SystemExit
         rect = text_surface.get_rect()
         rect.center = int(surface.get_size()[0] / 2), int(surface.get_size()[1] / 2)
         surface.blit(text_surface, rect)
+        return rect
 
-    def draw(self, surface: Surface, state: GameState):
+    def draw(self, surface: Surface, state: GameState, loading_stage: str = "") -> Rect:
+        """ draws the message for state and returns the area it covers """
 
         if state == GameState.WON:
             self._message = "You won! Press RETURN to continue"
@@ -40,5 +43,7 @@ class UI:
             self._message = ""
         elif state == GameState.NOT_RUNNING:
             self._message = "Press RETURN to start"
+        elif state == GameState.LOADING_LEVEL:
+            self._message = f"Loading {loading_stage}..."
 
-        self._print_text(surface, self._message, self._font)
+        return self._print_text(surface, self._message, self._font)
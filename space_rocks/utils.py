@@ -1,32 +1,63 @@
 import math
 import random
-from typing import Tuple
+from typing import Optional, Tuple
 
 import pygame
+from pygame.mask import Mask
 from pygame.math import Vector2
-from pygame.sprite import Sprite
 from pygame.surface import Surface
 from pygame.transform import rotozoom
 
+from space_rocks import constants
 from space_rocks.geometry import Geometry
 from space_rocks.window import window
 
+_rng = random.Random()
+_simulated_ticks: Optional[int] = None
+
+
+def seed_random(seed: int):
+    _rng.seed(seed)
+
+
+def get_ticks() -> int:
+    """ pygame ticks, or the simulated ticks once a simulation clock is in use """
+    if _simulated_ticks is None:
+        return pygame.time.get_ticks()
+    return _simulated_ticks
+
+
+def use_simulated_ticks(ticks: int = 0):
+    global _simulated_ticks
+    _simulated_ticks = ticks
+
+
+def advance_simulated_ticks(ms: int):
+    global _simulated_ticks
+    assert _simulated_ticks is not None
+    _simulated_ticks += ms
+
 
 def get_random_position(surface: Surface) -> Vector2:
     return Vector2(
-        random.randrange(50, surface.get_width() - 50),
-        random.randrange(50, surface.get_height() - 50),
+        _rng.randrange(50, surface.get_width() - 50),
+        _rng.randrange(50, surface.get_height() - 50),
     )
 
 
+def step_seconds() -> float:
+    """ simulated time per step """
+    return 1 / constants.SIMULATION_RATE
+
+
 def get_random_velocity(min_speed: float, max_speed: float) -> Vector2:
-    speed = random.uniform(min_speed, max_speed) * random.uniform(0.5, 1.5)
-    angle = random.randrange(0, 360)
+    speed = _rng.uniform(min_speed, max_speed) * _rng.uniform(0.5, 1.5)
+    angle = _rng.randrange(0, 360)
     return Vector2(speed, 0).rotate(angle)
 
 
 def get_random_rotation(min_rotation: float, max_rotation: float) -> float:
-    r = random.uniform(min_rotation, max_rotation) * random.choice([1, -1])
+    r = _rng.uniform(min_rotation, max_rotation) * _rng.choice([1, -1])
     return r
 
 
@@ -39,13 +70,15 @@ def is_in_screen(screen: Surface, geometry: Geometry):
     return screen.get_rect().collidepoint(geometry.position.x, geometry.position.y)
 
 
-def sprite_collide(a: Sprite, b: Sprite):
-    return pygame.sprite.spritecollide(
-        a,
-        pygame.sprite.Group(b),
-        False,
-        pygame.sprite.collide_mask,
+def mask_collide(a: Mask, a_position: Vector2, b: Mask, b_position: Vector2):
+    """ pixel perfect overlap of two masks, each centered like its sprite is drawn """
+    a_width, a_height = a.get_size()
+    b_width, b_height = b.get_size()
+    offset = (
+        int(b_position.x - b_width * 0.5) - int(a_position.x - a_width * 0.5),
+        int(b_position.y - b_height * 0.5) - int(a_position.y - a_height * 0.5),
     )
+    return a.overlap(b, offset) is not None
 
 
 def get_safe_enemy_distance(screen: Surface, player_position: Vector2) -> Vector2:
@@ -66,14 +99,16 @@ def get_resize_factor(factor: float) -> Tuple[int, int]:
 def bounce_edge(
     surface: Surface, edge_offset: int, velocity_decrease: float, geometry: Geometry
 ) -> Geometry:
+    """ moves and bounces geometry in place, and returns it """
     assert edge_offset > 0
     assert 0 < velocity_decrease <= 1
 
-    position = geometry.position + geometry.velocity
+    geometry.advance(step_seconds())
+    position = geometry.position
+    velocity = geometry.velocity
     w, h = surface.get_size()
     e = edge_offset
-    velocity = Vector2(geometry.velocity)
-    vel_decrease_threshold = 1
+    vel_decrease_threshold = constants.JSON_SPEED_RATE  # a json speed of 1
 
     if position.x >= w - e or position.x <= e:
         if abs(velocity.x) < vel_decrease_threshold:
@@ -86,37 +121,38 @@ def bounce_edge(
         else:
             velocity.y = (velocity.y * velocity_decrease) * -1
 
-    geometry = geometry.update_vel(velocity)
-    return geometry.update_pos(position)
+    return geometry
 
 
-def bounce_other(obj: Geometry, other: Geometry) -> Geometry:
-    vel = Vector2(obj.velocity)
+def _away_from(velocity: float, pos: float, other_pos: float) -> float:
+    velocity = abs(velocity)
+    if other_pos > 0:
+        return velocity * -1 if other_pos > pos else velocity
+    else:
+        return velocity if other_pos < pos else velocity * -1
 
-    def update_velocity(velocity: float, pos: float, other_pos: float):
-        velocity = abs(velocity)
-        if other_pos > 0:
-            return velocity * -1 if other_pos > pos else velocity
-        else:
-            return velocity if other_pos < pos else velocity * -1
 
-    vel.x = update_velocity(vel.x, obj.position.x, other.position.x)
-    vel.y = update_velocity(vel.y, obj.position.y, other.position.y)
-
-    return obj.update_vel(vel)
+def bounce_other(obj: Geometry, other: Geometry) -> Geometry:
+    """ turns the velocity of obj away from other in place, and returns obj """
+    obj.set_vel(
+        _away_from(obj.velocity.x, obj.position.x, other.position.x),
+        _away_from(obj.velocity.y, obj.position.y, other.position.y),
+    )
+    return obj
 
 
 def get_random_choice(text: str) -> str:
     text = text.lower()
-    return random.choice(
+    return _rng.choice(
         [x.strip(" ") for x in text.split(",")]
     )  # randomize what to play if many
 
 
 def get_blit_position(surface: Surface, position: Vector2):
-    surface_size = Vector2(surface.get_size())
-    blit_position = position - surface_size * 0.5
-    return (int(blit_position.x), int(blit_position.y))
+    return (
+        int(position.x - surface.get_width() * 0.5),
+        int(position.y - surface.get_height() * 0.5),
+    )
 
 
 def scale_surface(surface: Surface, size: Tuple[int, int]) -> Surface:
@@ -160,5 +196,12 @@ def init_display() -> Surface:
     return screen
 
 
+def init_headless_display(
+    size: Tuple[int, int] = (constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT)
+) -> Surface:
+    # expects SDL_VIDEODRIVER=dummy, set before pygame is initialized
+    return pygame.display.set_mode(size)
+
+
 def init_fonts():
     pygame.font.init()